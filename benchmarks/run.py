@@ -0,0 +1,277 @@
+"""Benchmarks for the selection and assignment hot paths.
+
+Generates synthetic teams (5 to 50,000 people) and range files (up to 1M
+entries), times each hot path per call and records peak memory, and writes
+JSON results that can be diffed between commits.
+
+    python benchmarks/run.py                       # full run, JSON to stdout
+    python benchmarks/run.py --quick -o new.json   # small sizes only
+    python benchmarks/run.py --compare old.json new.json
+
+A size is skipped (and larger sizes for the same benchmark are not attempted)
+once a single call exceeds --max-seconds, which is where the scaling cliffs are.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bot  # noqa: E402
+import selection_kernel  # noqa: E402
+import state  # noqa: E402
+
+TEAM_SIZES = [5, 50, 500, 5_000, 50_000]
+RANGE_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+QUICK_TEAM_SIZES = [5, 50, 500]
+QUICK_RANGE_SIZES = [1_000, 10_000]
+
+TARGET_DATE = datetime(2026, 3, 4, 9, 0, tzinfo=bot.LOCAL_TZ)  # a Wednesday: two anyday slots
+
+
+def make_people(n):
+    return [f"Person{i:05d}" for i in range(n)]
+
+
+def make_operations(n_people):
+    """Onboarding + imaging + enough anyday tasks for two per ops person (capped)."""
+    n_anyday = min(max(7, 2 * n_people), 2_000)
+    return (
+        ["<https://example.com/onboarding|Onboarding Tickets>",
+         "<https://example.com/imaging|System Imaging FTE/Contract>"]
+        + [f"<https://example.com/task/{i}|Anyday Task {i}>" for i in range(n_anyday)]
+    )
+
+
+def make_weekly(people, rng):
+    return {
+        "week": bot.get_week_key(TARGET_DATE),
+        "assignments": {p: rng.randint(0, 2) for p in people if rng.random() < 0.5},
+    }
+
+
+def make_ranges(n, people, rng):
+    base = datetime(2026, 1, 1)
+    entries = []
+    for _ in range(n):
+        start = base + timedelta(days=rng.randint(0, 365))
+        end = start + timedelta(days=rng.randint(0, 60))
+        entries.append({
+            "person": rng.choice(people),
+            "start": start.strftime("%Y-%m-%d"),
+            "end": end.strftime("%Y-%m-%d"),
+        })
+    return entries
+
+
+def measure(fn, repeat, max_seconds):
+    """Time fn() `repeat` times and record peak traced memory of one call.
+
+    Returns a result dict, or None if the first call exceeded max_seconds.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    if first > max_seconds:
+        return None
+
+    timings = [first]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls": len(timings),
+        "mean_s": statistics.fmean(timings),
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def team_cases(n, rng):
+    """Yield (name, fn) for every team-size benchmark at size n."""
+    people = make_people(n)
+    operations = make_operations(n)
+    weekly = make_weekly(people, rng)
+    history = [rng.sample(people, min(2, n)), rng.sample(people, min(2, n))]
+    history_excluded = bot.get_excluded_people(history)
+    day_excluded_lower = {p.casefold() for p in rng.sample(people, n // 10)}
+    last_ops = {p: ["anyday task 1", "anyday task 2"] for p in people}
+    ops_people = people[2:]
+    selected, assignments = bot.run_selection(
+        people, operations, history_excluded, day_excluded_lower,
+        False, last_ops, weekly, 3, "wednesday",
+    )
+
+    yield "run_selection", lambda: bot.run_selection(
+        people, operations, history_excluded, day_excluded_lower,
+        False, last_ops, weekly, 3, "wednesday",
+    )
+    yield "assign_operations_by_day", lambda: bot.assign_operations_by_day(
+        ops_people, operations, "wednesday", last_ops
+    )
+    yield "select_onboarding", lambda: bot.select_onboarding(
+        people, day_excluded_lower, history[-1]
+    )
+    if selection_kernel.available():
+        yield from kernel_cases(people, history_excluded, day_excluded_lower, weekly, rng)
+    yield "format_message", lambda: bot.format_message(selected, assignments, history[-1], "FTE")
+    yield "format_preview_message", lambda: bot.format_preview_message(
+        selected, assignments, history[-1], "FTE", "Wednesday"
+    )
+
+
+def kernel_cases(people, history_excluded, day_excluded_lower, weekly, rng):
+    """Yield the NumPy kernel benchmark: the draw alone, with the masks already built."""
+    np = selection_kernel.np
+    keys = [p.casefold() for p in people]
+    day = np.array([k in day_excluded_lower for k in keys])
+    history_lower = {n.casefold() for n in history_excluded}
+    history = np.array([k in history_lower for k in keys])
+    counts = np.array([weekly["assignments"].get(p, 0) for p in people])
+    generator = np.random.default_rng(rng.getrandbits(64))
+    yield "select_helpdesk_kernel", lambda: selection_kernel.select_helpdesk(
+        day, history, counts, 3, bot.get_config().weekly_need_weight, rng=generator
+    )
+
+
+def range_cases(n, rng, workdir):
+    """Yield (name, fn) for the range-override benchmarks over n range entries."""
+    people = make_people(5_000)
+    path = Path(workdir) / f"ranges_{n}.json"
+    path.write_text(json.dumps(make_ranges(n, people, rng)))
+    bot.UNAVAILABLE_RANGES_FILE = path
+
+    def cold():
+        state.invalidate(path)
+        return bot.get_range_overrides(TARGET_DATE)
+
+    yield "get_range_overrides_cold", cold
+    bot.get_range_overrides(TARGET_DATE)
+    yield "get_range_overrides_warm", lambda: bot.get_range_overrides(TARGET_DATE)
+
+
+def run_suite(team_sizes, range_sizes, repeat, max_seconds, seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    results = []
+    given_up = set()
+
+    def record(kind, n, name, fn):
+        if name in given_up:
+            results.append({"name": name, kind: n, "skipped": True})
+            return
+        result = measure(fn, repeat, max_seconds)
+        if result is None:
+            given_up.add(name)
+            results.append({"name": name, kind: n, "skipped": True})
+            print(f"{name:28} {kind}={n:>9,}  exceeded {max_seconds}s, skipping larger sizes",
+                  file=sys.stderr)
+            return
+        results.append({"name": name, kind: n, **result})
+        print(f"{name:28} {kind}={n:>9,}  median {result['median_s'] * 1e3:10.3f} ms  "
+              f"peak {result['peak_kib']:>10,.1f} KiB", file=sys.stderr)
+
+    for n in team_sizes:
+        for name, fn in team_cases(n, rng):
+            record("people", n, name, fn)
+
+    original_ranges_file = bot.UNAVAILABLE_RANGES_FILE
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            for n in range_sizes:
+                for name, fn in range_cases(n, rng, workdir):
+                    record("ranges", n, name, fn)
+        finally:
+            bot.UNAVAILABLE_RANGES_FILE = original_ranges_file
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path, new_path):
+    """Print median latency ratios (new / old) for benchmarks present in both files."""
+    def key(r):
+        return (r["name"], r.get("people"), r.get("ranges"))
+
+    old = {key(r): r for r in json.loads(Path(old_path).read_text())["results"]}
+    new = {key(r): r for r in json.loads(Path(new_path).read_text())["results"]}
+    for k in sorted(set(old) & set(new), key=lambda k: (k[0], k[1] or 0, k[2] or 0)):
+        o, n = old[k], new[k]
+        size = k[1] if k[1] is not None else k[2]
+        if o.get("skipped") or n.get("skipped"):
+            status = f"old {'skipped' if o.get('skipped') else 'ok'}, new {'skipped' if n.get('skipped') else 'ok'}"
+            print(f"{k[0]:28} {size:>9,}  {status}")
+            continue
+        ratio = n["median_s"] / o["median_s"] if o["median_s"] else float("inf")
+        print(f"{k[0]:28} {size:>9,}  {o['median_s'] * 1e3:10.3f} ms -> {n['median_s'] * 1e3:10.3f} ms"
+              f"  x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    parser.add_argument("--repeat", type=int, default=5, help="timed calls per case")
+    parser.add_argument("--max-seconds", type=float, default=5.0,
+                        help="skip larger sizes once one call takes longer than this")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("-o", "--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    logging.disable(logging.CRITICAL)
+    os.environ.pop("SIMULATE_DAY", None)
+    results = run_suite(
+        QUICK_TEAM_SIZES if args.quick else TEAM_SIZES,
+        QUICK_RANGE_SIZES if args.quick else RANGE_SIZES,
+        args.repeat, args.max_seconds, args.seed,
+    )
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
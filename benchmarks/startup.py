@@ -0,0 +1,157 @@
+"""Cold-start benchmark for bot.py and server.py.
+
+Imports each module in a fresh interpreter with `python -X importtime`,
+repeats that a few times, and records the median total import time, the
+slowest direct imports, the wall time of the whole process, and which
+heavyweight optional packages (requests, APScheduler, NumPy) got loaded
+along the way. Importing server runs its startup (config validation,
+range id check) inside a scratch directory, so nothing is written next to
+the repo; the scheduler and outbox start later, per worker.
+
+    python benchmarks/startup.py                     # JSON to stdout
+    python benchmarks/startup.py -o startup.json
+    python benchmarks/startup.py --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+MODULES = ["bot", "server"]
+HEAVY = ["requests", "apscheduler", "numpy"]
+
+PROBE = (
+    "import sys; import {module}; "
+    "print(' '.join(m for m in {heavy!r} if m in sys.modules))"
+)
+
+
+def parse_importtime(stderr):
+    """Return [(depth, name, self_us, cumulative_us)] from -X importtime output."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def import_once(module, workdir):
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(REPO),
+        SLACK_WEBHOOK_URL="",
+        OUTBOX_FILE=str(Path(workdir) / "outbox.db"),
+        HISTORY_FILE=str(Path(workdir) / "selection_history.json"),
+        UNAVAILABLE_FILE=str(Path(workdir) / "unavailable.json"),
+        UNAVAILABLE_RANGES_FILE=str(Path(workdir) / "unavailable_ranges.json"),
+        SQLITE_FILE=str(Path(workdir) / "duty_bot.db"),
+        LOG_LEVEL="WARNING",
+    )
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, heavy=HEAVY)],
+        capture_output=True, text=True, cwd=workdir, env=env,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    return wall, parse_importtime(proc.stderr), proc.stdout.split()
+
+
+def measure(module, repeat, top, workdir):
+    import_once(module, workdir)  # warm-up: writes __pycache__, like a restarted container
+    walls, totals, children = [], [], {}
+    heavy = []
+    for _ in range(repeat):
+        wall, entries, heavy = import_once(module, workdir)
+        walls.append(wall)
+        totals.append(next(c for d, name, _, c in entries if d == 0 and name == module))
+        for depth, name, _, cumulative in entries:
+            if depth == 1:
+                children.setdefault(name, []).append(cumulative)
+    slowest = sorted(
+        ((name, statistics.median(values)) for name, values in children.items()),
+        key=lambda item: -item[1],
+    )[:top]
+    return {
+        "module": module,
+        "import_ms": statistics.median(totals) / 1e3,
+        "process_ms": statistics.median(walls) * 1e3,
+        "heavy_loaded": heavy,
+        "slowest_imports": [{"name": name, "ms": us / 1e3} for name, us in slowest],
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=REPO,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path, new_path):
+    """Print median import times (old -> new) for modules present in both files."""
+    old = {r["module"]: r for r in json.loads(Path(old_path).read_text())["results"]}
+    new = {r["module"]: r for r in json.loads(Path(new_path).read_text())["results"]}
+    for module in [m for m in old if m in new]:
+        o, n = old[module], new[module]
+        ratio = n["import_ms"] / o["import_ms"] if o["import_ms"] else float("inf")
+        print(f"{module:8} import {o['import_ms']:8.1f} ms -> {n['import_ms']:8.1f} ms  x{ratio:.2f}"
+              f"   process {o['process_ms']:8.1f} ms -> {n['process_ms']:8.1f} ms")
+        added = sorted(set(n["heavy_loaded"]) - set(o["heavy_loaded"]))
+        if added:
+            print(f"{'':8} now loads: {', '.join(added)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=MODULES, help="modules to import (default: bot server)")
+    parser.add_argument("--repeat", type=int, default=7, help="fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=8, help="slowest direct imports to record")
+    parser.add_argument("-o", "--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for module in args.modules:
+            result = measure(module, args.repeat, args.top, workdir)
+            results.append(result)
+            print(f"{module:8} import {result['import_ms']:8.1f} ms  process {result['process_ms']:8.1f} ms"
+                  f"  heavy: {', '.join(result['heavy_loaded']) or '-'}", file=sys.stderr)
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
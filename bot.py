@@ -1,19 +1,39 @@
-import json
+import bisect
+import collections
+import concurrent.futures
+import functools
+import heapq
+import itertools
 import logging
+import math
 import os
 import random
+import secrets
+import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
-import requests
+import selection_kernel
+import state
+from roster import Roster
+from rotations import (
+    ROTATION_FIELDS, WEEKDAYS, Rotation, load_rotations, parse_rotation, parse_rotations, read_config_file,
+)
 
 # Configuration
-SLACK_WEBHOOK_URL = os.environ.get("SLACK_WEBHOOK_URL", "")
+# (numeric settings such as SLACK_MAX_RETRIES are parsed and validated by load_config)
+OUTBOX_FILE = Path(os.environ.get("OUTBOX_FILE", "outbox.db"))
 LOCAL_TZ = ZoneInfo("America/Los_Angeles")
 HISTORY_FILE = Path(os.environ.get("HISTORY_FILE", "selection_history.json"))
 UNAVAILABLE_FILE = Path(os.environ.get("UNAVAILABLE_FILE", "unavailable.json"))
 UNAVAILABLE_RANGES_FILE = Path(os.environ.get("UNAVAILABLE_RANGES_FILE", "unavailable_ranges.json"))
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "json").strip().casefold()
+SQLITE_FILE = Path(os.environ.get("SQLITE_FILE", "duty_bot.db"))
+# Outcome of the latest run, shared by every server process (GET /api/last-run)
+LAST_RUN_FILE = Path(os.environ.get("LAST_RUN_FILE", "last_run.json"))
 
 logging.basicConfig(
     level=os.environ.get("LOG_LEVEL", "INFO"),
@@ -66,16 +86,273 @@ def parse_env_list(value):
     return [item for item in parts if item]
 
 
-def get_config_list(env_var, default_list):
-    items = parse_env_list(os.environ.get(env_var, ""))
+def get_config_list(env_var, default_list, environ=None):
+    items = parse_env_list((os.environ if environ is None else environ).get(env_var, ""))
     return items if items else default_list
 
 
-def env_truthy(env_var):
-    value = os.environ.get(env_var, "")
+def env_truthy(env_var, environ=None):
+    value = (os.environ if environ is None else environ).get(env_var, "")
     return value.strip().lower() in {"1", "true", "yes", "y", "on"}
 
 
+def _default_rotation_from_env(environ):
+    """Build the single-team rotation from env vars and module defaults. Raises ValueError."""
+    day_exclusions = {}
+    for day in WEEKDAYS:
+        env_var = f"{day.upper()}_EXCLUSIONS"
+        names = parse_env_list(environ.get(env_var, DEFAULT_DAY_EXCLUSIONS.get(day.upper(), "")))
+        if names:
+            day_exclusions[day] = names
+    reduced = parse_env_list(environ.get("REDUCED_OPS_DAYS", DEFAULT_REDUCED_OPS_DAYS))
+    unknown = [d for d in reduced if d.casefold() not in WEEKDAYS]
+    if unknown:
+        raise ValueError(f"REDUCED_OPS_DAYS: unknown days {unknown}")
+    schedule = parse_onboarding_schedule(
+        environ.get("ONBOARDING_SCHEDULE", DEFAULT_ONBOARDING_SCHEDULE)
+    )
+    return Rotation(
+        name="default",
+        people=get_config_list("PEOPLE", PEOPLE, environ),
+        operations=get_config_list("OPERATIONS", OPERATIONS, environ),
+        day_ops_rules=DAY_OPS_RULES,
+        day_exclusions=day_exclusions,
+        reduced_ops_days=reduced,
+        onboarding_schedule=schedule,
+        webhook_url=environ.get("SLACK_WEBHOOK_URL", ""),
+        namespace="",
+    )
+
+
+# Parsed, validated configuration. Built by load_config() and never mutated;
+# reload_config() swaps in a whole new snapshot.
+Config = collections.namedtuple("Config", [
+    "default_rotation",  # the env-var / CONFIG_FILE rotation (also the defaults for other rotations)
+    "rotations",         # tuple of every rotation run on a tick
+    "people",            # tuple of everyone across rotations, first-seen order
+    "force_run",
+    "force_preview",
+    "force_reselect",
+    "simulate_day",      # SIMULATE_DAY (a weekday name), or ""
+    "sources",           # ((path, file version), ...) of the files it was read from
+    # Numeric settings, see NUMERIC_SETTINGS
+    "slack_max_retries",
+    "slack_backoff_base",
+    "slack_backoff_max",
+    "rotation_workers",
+    "rotation_timeout",
+    "weekly_need_weight",
+    "vector_selection_min_people",
+    "config_poll_seconds",
+])
+
+# env var -> (type, default, minimum, whether the minimum itself is allowed)
+NUMERIC_SETTINGS = {
+    "SLACK_MAX_RETRIES": (int, 3, 0, True),
+    "SLACK_BACKOFF_BASE": (float, 1.0, 0, True),
+    "SLACK_BACKOFF_MAX": (float, 30.0, 0, True),
+    "ROTATION_WORKERS": (int, 8, 1, True),
+    "ROTATION_TIMEOUT": (float, 300.0, 0, False),
+    # Selection weight for people who still need their weekly Service Desk shift (others weigh 1)
+    "WEEKLY_NEED_WEIGHT": (float, 3.0, 0, False),
+    # Rosters at least this large use the NumPy selection kernel when NumPy is installed
+    "VECTOR_SELECTION_MIN_PEOPLE": (int, 1000, 0, True),
+    # Seconds between checks of CONFIG_FILE / ROTATIONS_FILE for changes (0 disables)
+    "CONFIG_POLL_SECONDS": (float, 30.0, 0, True),
+}
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def _apply_config_file(path, default):
+    """Overlay CONFIG_FILE on the env-var rotation. Returns (default rotation, rotations or None)."""
+    data = read_config_file(path)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected an object of settings")
+    unknown = set(data) - ROTATION_FIELDS - {"rotations"}
+    if unknown:
+        raise ValueError(f"{path}: unknown settings {sorted(unknown)}")
+    overrides = {key: value for key, value in data.items() if key != "rotations"}
+    default = parse_rotation(
+        {"people": list(default.people), **overrides, "name": default.name}, default, namespace=""
+    )
+    rotations = parse_rotations(data["rotations"], default, path) if "rotations" in data else None
+    return default, rotations
+
+
+def parse_numeric_settings(environ):
+    """Parse NUMERIC_SETTINGS from the environment. Raises ValueError.
+
+    Returns: {lowercased env var: value}
+    """
+    values = {}
+    for env_var, (kind, default, minimum, inclusive) in NUMERIC_SETTINGS.items():
+        raw = environ.get(env_var, "").strip()
+        try:
+            value = kind(raw) if raw else default
+        except ValueError:
+            expected = "an integer" if kind is int else "a number"
+            raise ValueError(f"{env_var}: expected {expected}, got {raw!r}") from None
+        if not math.isfinite(value) or value < minimum or (value == minimum and not inclusive):
+            bound = f">= {minimum}" if inclusive else f"> {minimum}"
+            raise ValueError(f"{env_var}: must be a finite number {bound}, got {raw!r}")
+        values[env_var.lower()] = value
+    return values
+
+
+def load_config(environ=None):
+    """Parse and validate the configuration. Raises ValueError on anything invalid.
+
+    Env vars give the default rotation; CONFIG_FILE (JSON or TOML), if set,
+    overrides its settings and may list the rotations itself, otherwise
+    ROTATIONS_FILE does.
+    """
+    environ = os.environ if environ is None else environ
+    paths = [Path(environ[var].strip()) for var in ("CONFIG_FILE", "ROTATIONS_FILE")
+             if environ.get(var, "").strip()]
+    # Versions are taken before reading so a write during the load triggers another reload
+    sources = tuple((path, state.file_version(path)) for path in paths)
+
+    default = _default_rotation_from_env(environ)
+    rotations = None
+    config_file = environ.get("CONFIG_FILE", "").strip()
+    if config_file:
+        default, rotations = _apply_config_file(Path(config_file), default)
+    rotations_file = environ.get("ROTATIONS_FILE", "").strip()
+    if rotations is None:
+        rotations = load_rotations(Path(rotations_file), default) if rotations_file else [default]
+
+    simulate_day = environ.get("SIMULATE_DAY", "").strip()
+    if simulate_day and simulate_day.casefold() not in WEEKDAYS:
+        raise ValueError(f"SIMULATE_DAY: unknown day {simulate_day!r}")
+
+    return Config(
+        default_rotation=default,
+        rotations=tuple(rotations),
+        people=tuple(dict.fromkeys(p for r in rotations for p in r.people)),
+        force_run=env_truthy("FORCE_RUN", environ),
+        force_preview=env_truthy("FORCE_PREVIEW", environ),
+        force_reselect=env_truthy("FORCE_RESELECT", environ),
+        simulate_day=simulate_day,
+        sources=sources,
+        **parse_numeric_settings(environ),
+    )
+
+
+def get_config():
+    """Return the current configuration snapshot, loading it on first use.
+
+    Never blocks on a reload: readers get whichever snapshot is current.
+    """
+    config = _config
+    if config is None:
+        config = reload_config()
+    return config
+
+
+def reload_config(environ=None):
+    """Re-read the environment and config files and swap in the new snapshot.
+
+    If the new configuration is invalid, ValueError is raised and the
+    current snapshot stays in place. Runs already in progress keep the
+    rotations they started with.
+    """
+    global _config
+    with _config_lock:
+        config = load_config(environ)
+        _config = config
+    logger.info("Loaded configuration: %d rotation(s), %d people",
+                len(config.rotations), len(config.people))
+    return config
+
+
+def config_changed(config=None):
+    """Return True if a file the snapshot was read from has changed since."""
+    config = config or get_config()
+    return any(state.file_version(path) != version for path, version in config.sources)
+
+
+def refresh_config():
+    """Reload if a config file changed since the current snapshot was read.
+
+    An invalid change is logged and the current snapshot kept. Returns the
+    snapshot in use.
+    """
+    config = get_config()
+    if not config_changed(config):
+        return config
+    try:
+        return reload_config()
+    except ValueError as exc:
+        logger.error("Config change rejected, keeping the current configuration: %s", exc)
+        return config
+
+
+def touch_config_files():
+    """Bump the mtime of CONFIG_FILE / ROTATIONS_FILE so other processes' watchers reload."""
+    for path, _ in get_config().sources:
+        try:
+            os.utime(path)
+        except OSError:
+            logger.warning("Could not touch %s (read-only filesystem?)", path)
+
+
+_config_watcher = None
+
+
+def watch_config(interval=None):
+    """Start a daemon thread that reloads the config when its files change (idempotent).
+
+    A change that fails validation is logged once and the current
+    configuration is kept until the files change again.
+    """
+    global _config_watcher
+    interval = get_config().config_poll_seconds if interval is None else interval
+    if interval <= 0 or (_config_watcher is not None and _config_watcher.is_alive()):
+        return _config_watcher
+
+    def poll():
+        rejected = None
+        while True:
+            time.sleep(interval)
+            config = get_config()
+            if not config_changed(config):
+                continue
+            versions = [state.file_version(path) for path, _ in config.sources]
+            if versions == rejected:
+                continue
+            try:
+                reload_config()
+                rejected = None
+            except ValueError as exc:
+                logger.error("Config change rejected, keeping the current configuration: %s", exc)
+                rejected = versions
+
+    _config_watcher = threading.Thread(target=poll, name="config-watcher", daemon=True)
+    _config_watcher.start()
+    return _config_watcher
+
+
+def get_default_rotation():
+    """Return the single-team rotation configured through env vars and module defaults."""
+    return get_config().default_rotation
+
+
+def get_rotations():
+    """Return every configured rotation.
+
+    Without ROTATIONS_FILE this is just the default single-team rotation.
+    Raises ValueError if the configuration is invalid.
+    """
+    return list(get_config().rotations)
+
+
+def get_all_people():
+    """Return everyone across all rotations, in first-seen order."""
+    return list(get_config().people)
+
+
 def extract_task_name(task):
     """Extract display name from a task (handles Slack hyperlink format)."""
     if "|" in task and task.startswith("<"):
@@ -83,55 +360,134 @@ def extract_task_name(task):
     return task.strip()
 
 
-def find_task_by_name(operations, name_fragment):
-    """Find task containing name fragment (case-insensitive)."""
-    name_lower = name_fragment.casefold()
-    for task in operations:
-        if name_lower in extract_task_name(task).casefold():
-            return task
-    return None
+class Task:
+    """One OPERATIONS entry, parsed once."""
 
+    __slots__ = ("raw", "url", "name", "key", "category")
 
-def get_anyday_tasks(operations):
-    """Return tasks that are not onboarding or system imaging."""
-    excluded_names = {"onboarding", "system imaging"}
-    available = []
-    for task in operations:
-        task_name = extract_task_name(task).casefold()
-        if not any(excl in task_name for excl in excluded_names):
-            available.append(task)
-    return available
+    def __init__(self, raw):
+        self.raw = raw
+        self.name = extract_task_name(raw)
+        self.key = self.name.casefold()
+        self.url = raw[1:].rsplit("|", 1)[0] if "|" in raw and raw.startswith("<") else ""
+        if "onboarding" in self.key:
+            self.category = "onboarding"
+        elif "system imaging" in self.key:
+            self.category = "imaging"
+        else:
+            self.category = "anyday"
 
+    def __repr__(self):
+        return f"Task({self.name!r}, {self.category})"
 
-def pick_anyday_task(pool, used_tasks, yesterday_tasks):
-    """Pick an unused anyday task, preferring ones not done yesterday.
 
-    Args:
-        pool: list of available anyday tasks
-        used_tasks: set of task names (casefolded) already assigned today
-        yesterday_tasks: list of task names (casefolded) this person did yesterday
+class TaskCatalog:
+    """An operations list parsed once, with O(1) lookup by key and per-category pools.
 
-    Returns: task string or None if no tasks available
+    onboarding / imaging are the first tasks whose name contains "onboarding" /
+    "system imaging"; anyday holds everything else.
     """
-    yesterday_set = set(yesterday_tasks)
 
-    # Filter out already-used tasks
-    available = [t for t in pool if extract_task_name(t).casefold() not in used_tasks]
-    if not available:
-        return None
+    def __init__(self, operations):
+        self.tasks = [Task(raw) for raw in operations]
+        self.by_key = {}
+        self.by_raw = {}
+        for task in self.tasks:
+            self.by_key.setdefault(task.key, task)
+            self.by_raw.setdefault(task.raw, task)
+        self.onboarding = next((t for t in self.tasks if "onboarding" in t.key), None)
+        self.imaging = next((t for t in self.tasks if "system imaging" in t.key), None)
+        self.anyday = [t for t in self.tasks if t.category == "anyday"]
+
+    def get(self, key):
+        """Return the Task with this casefolded name, or None."""
+        return self.by_key.get(key)
+
+    def key_of(self, raw):
+        """Return the casefolded name of a raw task string (parsed only if not in the catalog)."""
+        task = self.by_raw.get(raw)
+        return task.key if task else extract_task_name(raw).casefold()
+
 
-    # Prefer tasks not done yesterday
-    fresh = [t for t in available if extract_task_name(t).casefold() not in yesterday_set]
-    if fresh:
-        return random.choice(fresh)
+@functools.lru_cache(maxsize=64)
+def _task_catalog(operations):
+    return TaskCatalog(operations)
 
-    # Fall back to any available task
-    return random.choice(available)
+
+def get_task_catalog(operations):
+    """Return the (cached) TaskCatalog for an operations list."""
+    return _task_catalog(tuple(operations))
+
+
+@functools.lru_cache(maxsize=64)
+def _roster(people):
+    return Roster(people)
+
+
+def get_roster(people):
+    """Return the (cached) Roster for a list of people."""
+    if isinstance(people, Roster):
+        return people
+    return _roster(tuple(people))
+
+
+class AnydayPool:
+    """Anyday tasks not yet assigned today, removed as they are handed out.
+
+    Tasks live in a list with a key -> position map, so taking one is a
+    swap-remove instead of re-filtering the whole pool for every slot.
+    """
+
+    def __init__(self, tasks):
+        self._tasks = []
+        self._positions = {}
+        for task in tasks:
+            if task.key not in self._positions:
+                self._positions[task.key] = len(self._tasks)
+                self._tasks.append(task)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def _remove(self, key):
+        pos = self._positions.pop(key)
+        last = self._tasks.pop()
+        if pos < len(self._tasks):
+            self._tasks[pos] = last
+            self._positions[last.key] = pos
+
+    def take(self, yesterday_tasks=()):
+        """Remove and return a random unused task, preferring ones not done yesterday.
+
+        Args:
+            yesterday_tasks: task names (casefolded) this person did yesterday
+
+        Returns: Task or None if the pool is empty
+        """
+        count = len(self._tasks)
+        if not count:
+            return None
+
+        yesterday_set = set(yesterday_tasks)
+        blocked = sum(1 for key in yesterday_set if key in self._positions)
+        if blocked == count:
+            # Only yesterday's tasks are left: fall back to any of them
+            task = random.choice(self._tasks)
+        elif blocked * 2 <= count:
+            # Few blocked: rejection sampling is uniform over fresh tasks in O(1) expected
+            task = self._tasks[random.randrange(count)]
+            while task.key in yesterday_set:
+                task = self._tasks[random.randrange(count)]
+        else:
+            task = random.choice([t for t in self._tasks if t.key not in yesterday_set])
+
+        self._remove(task.key)
+        return task
 
 
 def get_day_name(now=None):
     """Return the day name, or SIMULATE_DAY if set (for testing)."""
-    simulated = os.environ.get("SIMULATE_DAY", "").strip()
+    simulated = get_config().simulate_day
     if simulated:
         logger.debug("Simulating day: %s", simulated)
         return simulated
@@ -149,10 +505,9 @@ def get_week_key(now=None):
 
 def get_remaining_workdays(now=None):
     """Return remaining workdays in week including today (Mon=5, Fri=1, Weekend=0)."""
-    simulated = os.environ.get("SIMULATE_DAY", "").strip()
+    simulated = get_config().simulate_day
     if simulated:
-        day_map = {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4}
-        weekday = day_map.get(simulated.casefold(), 0)
+        weekday = WEEKDAYS.index(simulated.casefold())
     else:
         if now is None:
             now = datetime.now(LOCAL_TZ)
@@ -162,9 +517,33 @@ def get_remaining_workdays(now=None):
     return 5 - weekday
 
 
-def load_history():
+_store = None
+
+
+def get_store():
+    """Return the SqliteStore when STORAGE_BACKEND=sqlite, else None (JSON files)."""
+    global _store
+    if STORAGE_BACKEND != "sqlite":
+        return None
+    if _store is None:
+        from sqlite_store import SqliteStore
+        _store = SqliteStore(SQLITE_FILE)
+    return _store
+
+
+def get_history_file(namespace=""):
+    """Return the history file for a rotation namespace ("" is HISTORY_FILE itself)."""
+    if not namespace:
+        return HISTORY_FILE
+    return HISTORY_FILE.with_name(f"{HISTORY_FILE.stem}.{namespace}{HISTORY_FILE.suffix}")
+
+
+def load_history(namespace=""):
     """Load selection history from file, including weekly ServiceDesk tracking.
 
+    Args:
+        namespace: rotation history namespace ("" for the single-team history)
+
     Returns: (selections, last_ops, weekly, preview, last_onboarding)
         preview is the next_day_selection dict or None.
         last_onboarding is the list of people from the last onboarding run.
@@ -172,34 +551,44 @@ def load_history():
     current_week = get_week_key()
     default_weekly = {"week": current_week, "assignments": {}}
 
-    if not HISTORY_FILE.exists():
-        return [], {}, default_weekly, None, []
-    try:
-        data = json.loads(HISTORY_FILE.read_text())
-        selections = data.get("last_selections", [])[-2:]
-        last_ops = data.get("last_ops", {})
-        if not isinstance(last_ops, dict):
-            last_ops = {}
-
-        weekly = data.get("weekly_servicedesk", {})
-        if weekly.get("week") != current_week:
-            weekly = default_weekly
-
-        preview = data.get("next_day_selection")
-        last_onboarding = data.get("last_onboarding", [])
-        return selections, last_ops, weekly, preview, last_onboarding
-    except (json.JSONDecodeError, OSError):
+    store = get_store()
+    if store is not None:
+        return store.load_history(current_week, namespace)
+
+    data = state.load_json(get_history_file(namespace), None)
+    if not isinstance(data, dict):
         return [], {}, default_weekly, None, []
 
+    selections = data.get("last_selections", [])[-2:]
+    last_ops = data.get("last_ops", {})
+    if not isinstance(last_ops, dict):
+        last_ops = {}
+
+    # Copy the weekly counts: the cached data is shared and save_history mutates them
+    weekly = data.get("weekly_servicedesk", {})
+    if weekly.get("week") != current_week:
+        weekly = default_weekly
+    else:
+        weekly = {"week": weekly["week"], "assignments": dict(weekly.get("assignments", {}))}
+
+    preview = data.get("next_day_selection")
+    last_onboarding = data.get("last_onboarding", [])
+    return selections, last_ops, weekly, preview, last_onboarding
+
 
 def save_history(selected, history, assignments=None, prev_ops=None, weekly=None,
-                 onboarding_people=None):
-    """Save updated selection history, keeping only last 2."""
+                 onboarding_people=None, namespace="", operations=None):
+    """Save updated selection history, keeping only last 2.
+
+    operations (the rotation's task list) lets task names come from its
+    TaskCatalog instead of being re-parsed.
+    """
     new_history = (history + [selected])[-2:]
     if assignments:
+        catalog = get_task_catalog(operations or [])
         ops = {}
         for person, tasks in assignments.items():
-            ops[person] = [extract_task_name(t).casefold() for t in tasks]
+            ops[person] = [catalog.key_of(t) for t in tasks]
     else:
         ops = prev_ops or {}
 
@@ -209,23 +598,68 @@ def save_history(selected, history, assignments=None, prev_ops=None, weekly=None
     for person in selected:
         weekly["assignments"][person] = weekly["assignments"].get(person, 0) + 1
 
-    data = {
-        "last_selections": new_history,
-        "last_ops": ops,
-        "weekly_servicedesk": weekly,
-        "last_onboarding": onboarding_people or [],
-    }
-    HISTORY_FILE.write_text(json.dumps(data))
+    today = datetime.now(LOCAL_TZ).strftime("%Y-%m-%d")
+    store = get_store()
+    if store is not None:
+        store.save_history(selected, ops, weekly, onboarding_people or [], namespace, today)
+        return
 
+    def apply(existing):
+        data = {
+            "last_selections": new_history,
+            "last_ops": ops,
+            "weekly_servicedesk": weekly,
+            "last_onboarding": onboarding_people or [],
+        }
+        # Keep the remaining days of a precomputed plan (see plan_schedule)
+        plan = existing.get("plan") if isinstance(existing, dict) else None
+        if plan:
+            data["plan"] = {d: entry for d, entry in plan.items() if d >= today}
+        return data
 
-def save_preview(preview_data):
+    state.update_json(get_history_file(namespace), {}, apply)
+
+
+def save_preview(preview_data, namespace=""):
     """Save next-day selection preview to history file without touching other fields."""
-    try:
-        data = json.loads(HISTORY_FILE.read_text()) if HISTORY_FILE.exists() else {}
-    except (json.JSONDecodeError, OSError):
-        data = {}
-    data["next_day_selection"] = preview_data
-    HISTORY_FILE.write_text(json.dumps(data))
+    check_deadline("saving the preview")
+    store = get_store()
+    if store is not None:
+        store.save_preview(preview_data, namespace)
+        return
+
+    def apply(data):
+        data = dict(data) if isinstance(data, dict) else {}
+        data["next_day_selection"] = preview_data
+        return data
+
+    state.update_json(get_history_file(namespace), {}, apply)
+
+
+def save_plan(plan, namespace=""):
+    """Persist a precomputed schedule ({date: day entry}) next to the history."""
+    check_deadline("saving the plan")
+    store = get_store()
+    if store is not None:
+        store.save_plan(plan, namespace)
+        return
+
+    def apply(data):
+        data = dict(data) if isinstance(data, dict) else {}
+        data["plan"] = plan
+        return data
+
+    state.update_json(get_history_file(namespace), {}, apply)
+
+
+def load_plan(namespace=""):
+    """Return the persisted schedule as {date: day entry} (empty if none)."""
+    store = get_store()
+    if store is not None:
+        return store.load_plan(namespace)
+    data = state.load_json(get_history_file(namespace), {})
+    plan = data.get("plan") if isinstance(data, dict) else None
+    return plan if isinstance(plan, dict) else {}
 
 
 def get_excluded_people(history):
@@ -243,18 +677,237 @@ def get_date_overrides(target_date=None):
 
     Returns: set of names marked unavailable for that date
     """
-    if not UNAVAILABLE_FILE.exists():
-        return set()
-    try:
-        data = json.loads(UNAVAILABLE_FILE.read_text())
-    except (json.JSONDecodeError, OSError):
-        return set()
     if target_date is None:
         target_date = datetime.now(LOCAL_TZ)
     date_key = target_date.strftime("%Y-%m-%d")
+
+    store = get_store()
+    if store is not None:
+        return store.people_on_date(date_key)
+
+    data = state.load_json(UNAVAILABLE_FILE, {})
+    if not isinstance(data, dict):
+        return set()
     return set(data.get(date_key, []))
 
 
+def _date_key(value):
+    """Return a YYYY-MM-DD key for a date/datetime or an already formatted string."""
+    if isinstance(value, str):
+        return value
+    return value.strftime("%Y-%m-%d")
+
+
+class RangeIndex:
+    """In-memory interval index over unavailable_ranges.json entries.
+
+    Entries are sorted by start date and covered by a max-end segment tree, so
+    "who is out on D" and "who is out anywhere in [D1, D2]" only descend into
+    subtrees that can still contain a match (O(log n + matches)).
+    """
+
+    def __init__(self, entries):
+        rows = []
+        for pos, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                continue
+            person = entry.get("person", "")
+            start = entry.get("start", "")
+            end = entry.get("end", "")
+            if person and end and start <= end:
+                # Page cursors are (start, end, person, id, tiebreak): the stable id
+                # breaks ties so cursors survive inserts and deletes, and the position
+                # only separates legacy entries that have no id yet
+                range_id = str(entry.get("id") or "")
+                rows.append((start, end, person, range_id, -1 if range_id else pos, pos))
+        rows.sort()
+
+        self.entries = entries
+        self._by_person = None
+        self._starts = [r[0] for r in rows]
+        self._ends = [r[1] for r in rows]
+        self._people = [r[2] for r in rows]
+        self._keys = [r[:5] for r in rows]
+        self._positions = [r[5] for r in rows]
+
+        size = 1
+        while size < len(rows):
+            size *= 2
+        self._size = size
+        # Leaves hold each entry's end date; inner nodes hold the max of their children.
+        # "" sorts before any date, so padding leaves never match.
+        tree = [""] * (2 * size)
+        tree[size:size + len(rows)] = self._ends
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._max_end = tree
+
+    def __len__(self):
+        return len(self._starts)
+
+    def _matches(self, start_key, end_key, first=0):
+        """Yield sorted-row numbers >= first of entries with start <= end_key and end >= start_key.
+
+        Rows come out in ascending order, so a caller can stop after a page.
+        """
+        limit = bisect.bisect_right(self._starts, end_key)
+        if not limit:
+            return
+        size = self._size
+        tree = self._max_end
+        stack = [(1, 0, size)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if lo >= limit or hi <= first or tree[node] < start_key:
+                continue
+            if node >= size:
+                yield lo
+                continue
+            mid = (lo + hi) // 2
+            stack.append((2 * node + 1, mid, hi))
+            stack.append((2 * node, lo, mid))
+
+    def people_on(self, date):
+        """Return the set of people with a range covering the given date."""
+        key = _date_key(date)
+        return {self._people[i] for i in self._matches(key, key)}
+
+    def entries_between(self, start, end):
+        """Return (position, entry) pairs overlapping [start, end], in file order."""
+        positions = sorted(self._positions[i] for i in self._matches(_date_key(start), _date_key(end)))
+        return [(pos, self.entries[pos]) for pos in positions]
+
+    def _person_rows(self):
+        if self._by_person is None:
+            by_person = {}
+            for i, person in enumerate(self._people):
+                by_person.setdefault(person.casefold(), []).append(i)
+            self._by_person = by_person
+        return self._by_person
+
+    def query(self, start=None, end=None, person=None, after=None, limit=None):
+        """Return a page of ranges overlapping [start, end], optionally for one person.
+
+        Results are (position, entry) pairs in start-date order. after is the
+        cursor returned with the previous page (the sort key of its last row);
+        with a limit, the cursor for the next page is returned
+        alongside (None on the last page).
+
+        Returns: (pairs, next_cursor)
+        """
+        if after is not None and not (
+            isinstance(after, (list, tuple)) and len(after) == 5
+            and all(isinstance(v, str) for v in after[:4]) and type(after[4]) is int
+        ):
+            raise ValueError("Invalid cursor")
+        start_key = _date_key(start) if start else ""
+        end_key = _date_key(end) if end else "9999-12-31"
+        first = bisect.bisect_right(self._keys, tuple(after)) if after is not None else 0
+        if person is None:
+            rows = self._matches(start_key, end_key, first)
+        else:
+            own = self._person_rows().get(person.casefold(), [])
+            rows = (
+                i for i in own[bisect.bisect_left(own, first):]
+                if self._starts[i] <= end_key and self._ends[i] >= start_key
+            )
+        page = list(itertools.islice(rows, limit + 1 if limit else None))
+        next_cursor = None
+        if limit and len(page) > limit:
+            page = page[:limit]
+            next_cursor = list(self._keys[page[-1]])
+        return [(self._positions[i], self.entries[self._positions[i]]) for i in page], next_cursor
+
+
+class DateOverrideIndex:
+    """Sorted index over unavailable.json ({date: [people]}) for window and person queries."""
+
+    def __init__(self, data):
+        self.data = data if isinstance(data, dict) else {}
+        self._dates = sorted(d for d, people in self.data.items() if isinstance(people, list) and people)
+        by_person = {}
+        for date_key in self._dates:
+            for person in self.data[date_key]:
+                if isinstance(person, str):
+                    dates = by_person.setdefault(person.casefold(), [])
+                    if not dates or dates[-1] != date_key:
+                        dates.append(date_key)
+        self._by_person = by_person
+
+    def __len__(self):
+        return len(self._dates)
+
+    def query(self, start=None, end=None, person=None, after=None, limit=None):
+        """Return a page of {date: people} for dates in [start, end], optionally for one person.
+
+        after is the cursor returned with the previous page (the last date it
+        held); with a limit, the cursor for the next page is returned alongside
+        (None on the last page).
+
+        Returns: (data, next_cursor)
+        """
+        if after is not None and not isinstance(after, str):
+            raise ValueError("Invalid cursor")
+        key = None if person is None else person.casefold()
+        dates = self._dates if key is None else self._by_person.get(key, [])
+        lo = bisect.bisect_left(dates, _date_key(start)) if start else 0
+        if after is not None:
+            lo = max(lo, bisect.bisect_right(dates, after))
+        hi = bisect.bisect_right(dates, _date_key(end)) if end else len(dates)
+        next_cursor = None
+        if limit and lo + limit < hi:
+            hi = lo + limit
+            next_cursor = dates[hi - 1]
+        page = dates[lo:hi]
+        if key is None:
+            return {d: self.data[d] for d in page}, next_cursor
+        return {d: [p for p in self.data[d] if isinstance(p, str) and p.casefold() == key] for d in page}, next_cursor
+
+
+def new_range_id():
+    """Return a stable id for a new range.
+
+    "r" + 16 hex digits: never all digits, so it can't be mistaken for a legacy
+    list position in /api/unavailable-ranges/<idx>.
+    """
+    return "r" + secrets.token_hex(8)
+
+
+def _build_range_index(data):
+    return RangeIndex(data if isinstance(data, list) else [])
+
+
+_sqlite_range_index = (None, None)
+
+
+def get_range_index():
+    """Return a RangeIndex for unavailable_ranges.json, rebuilt only when the file changes."""
+    global _sqlite_range_index
+    store = get_store()
+    if store is not None:
+        version = store.version("ranges")
+        if _sqlite_range_index[0] != version:
+            _sqlite_range_index = (version, RangeIndex(store.load_ranges()))
+        return _sqlite_range_index[1]
+    return state.load_json(UNAVAILABLE_RANGES_FILE, None, build=_build_range_index) or RangeIndex([])
+
+
+_sqlite_unavailable_index = (None, None)
+
+
+def get_unavailable_index():
+    """Return a DateOverrideIndex for unavailable.json, rebuilt only when the data changes."""
+    global _sqlite_unavailable_index
+    store = get_store()
+    if store is not None:
+        today = datetime.now(LOCAL_TZ).strftime("%Y-%m-%d")
+        version = (store.version("unavailable"), today)
+        if _sqlite_unavailable_index[0] != version:
+            _sqlite_unavailable_index = (version, DateOverrideIndex(store.load_unavailable(today)))
+        return _sqlite_unavailable_index[1]
+    return state.load_json(UNAVAILABLE_FILE, None, build=DateOverrideIndex) or DateOverrideIndex({})
+
+
 def get_range_overrides(target_date=None):
     """Read range-based unavailability from unavailable_ranges.json.
 
@@ -263,63 +916,51 @@ def get_range_overrides(target_date=None):
 
     Returns: set of names marked unavailable via ranges for that date
     """
-    if not UNAVAILABLE_RANGES_FILE.exists():
-        return set()
-    try:
-        data = json.loads(UNAVAILABLE_RANGES_FILE.read_text())
-    except (json.JSONDecodeError, OSError):
-        return set()
-    if not isinstance(data, list):
-        return set()
     if target_date is None:
         target_date = datetime.now(LOCAL_TZ)
-    date_key = target_date.strftime("%Y-%m-%d")
-    result = set()
-    for entry in data:
-        start = entry.get("start", "")
-        end = entry.get("end", "")
-        person = entry.get("person", "")
-        if person and start <= date_key <= end:
-            result.add(person)
-    return result
+    store = get_store()
+    if store is not None:
+        return store.people_in_ranges(_date_key(target_date))
+    return get_range_index().people_on(target_date)
 
 
-def get_day_exclusions(now=None):
+def get_day_exclusions(now=None, rotation=None, day_name=None):
     """Return people excluded based on day-specific env vars and date overrides.
 
-    Merges:
-      1. Day-of-week env vars (MONDAY_EXCLUSIONS, etc.) -- recurring, static
+    Merges, as bitsets over the rotation's roster:
+      1. Day-of-week exclusions (MONDAY_EXCLUSIONS, etc., or the rotation's
+         day_exclusions) -- recurring, static
       2. Date-specific overrides from unavailable.json -- ad-hoc, from web UI
       3. Range-based overrides from unavailable_ranges.json -- extended absences
 
-    Returns: tuple of (set of original names for logging, set of lowercased names for matching)
+    Names that are not on the roster (e.g. other rotations' people in the
+    shared unavailability files) are not in the bitset. day_name overrides the
+    weekday (default: get_day_name(now), which honours SIMULATE_DAY).
+
+    Returns: tuple of (set of original names for logging, exclusion bitset
+    for run_selection / select_onboarding)
     """
-    day_name = get_day_name(now).upper()  # e.g., "MONDAY"
-    env_var = f"{day_name}_EXCLUSIONS"
-    default = DEFAULT_DAY_EXCLUSIONS.get(day_name, "")
-    excluded_names = parse_env_list(os.environ.get(env_var, default))
-    # Merge date-specific and range-based overrides
+    rotation = rotation or get_default_rotation()
+    roster = rotation.roster
+    excluded_names = rotation.day_exclusions.get((day_name or get_day_name(now)).casefold(), [])
     date_overrides = get_date_overrides(now)
     range_overrides = get_range_overrides(now)
-    all_excluded = set(excluded_names) | date_overrides | range_overrides
-    # Return both original (for logging) and normalized (for matching)
-    return all_excluded, {name.casefold() for name in all_excluded}
-
-
-def get_people_needing_weekly_assignment(weekly, people):
-    """Return set of people (lowercased) with 0 ServiceDesk assignments this week."""
-    assignments = weekly.get("assignments", {})
-    return {p.casefold() for p in people if assignments.get(p, 0) == 0}
+    excluded = (
+        roster.mask_of(excluded_names)
+        | roster.mask_of(date_overrides)
+        | roster.mask_of(range_overrides)
+    )
+    return set(excluded_names) | date_overrides | range_overrides, excluded
 
 
-def calculate_weekly_priority(eligible_keys, people_needing, remaining_days):
+def calculate_weekly_priority(eligible_ids, people_needing, remaining_days):
     """Determine selection strategy based on urgency.
 
     Returns: (must_prioritize: bool, priority_pool: list)
     - must_prioritize: True if we MUST select from people_needing (Thu/Fri urgency)
     - priority_pool: eligible people who need their weekly assignment
     """
-    eligible_needing = [k for k in eligible_keys if k in people_needing]
+    eligible_needing = [i for i in eligible_ids if i in people_needing]
 
     max_remaining_slots = remaining_days * 2
     if people_needing and len(people_needing) >= max_remaining_slots:
@@ -328,50 +969,86 @@ def calculate_weekly_priority(eligible_keys, people_needing, remaining_days):
     return False, eligible_needing
 
 
-def get_onboarding_config(now=None):
-    """Return onboarding type for today, or None if no onboarding.
+def parse_onboarding_schedule(schedule_str):
+    """Parse "Monday:FTE,Tuesday:Contractor" into {"monday": "FTE", "tuesday": "Contractor"}.
 
-    Parses ONBOARDING_SCHEDULE env var (format: "Monday:FTE,Tuesday:Contractor")
-    Returns: str like "FTE" or "Contractor", or None if no onboarding today
+    Raises ValueError for entries that are not Day:Type or name an unknown day.
     """
-    schedule_str = os.environ.get("ONBOARDING_SCHEDULE", DEFAULT_ONBOARDING_SCHEDULE)
-    today = get_day_name(now).casefold()
-
+    schedule = {}
     for entry in schedule_str.split(","):
         entry = entry.strip()
-        if ":" in entry:
-            day, onb_type = entry.split(":", 1)
-            if day.strip().casefold() == today:
-                return onb_type.strip()
-    return None
+        if not entry:
+            continue
+        day, sep, onb_type = entry.partition(":")
+        day, onb_type = day.strip().casefold(), onb_type.strip()
+        if not sep or not onb_type or day not in WEEKDAYS:
+            raise ValueError(f"ONBOARDING_SCHEDULE: invalid entry {entry!r} (expected Day:Type)")
+        schedule.setdefault(day, onb_type)
+    return schedule
+
+
+def weighted_sample(items, weights, k, rng=random):
+    """Pick k distinct items, each draw proportional to weight among those not yet picked.
+
+    Efraimidis-Spirakis: each item gets key log(u) / w and the k largest keys
+    win, in draw order. O(n log k), no materialized pool. weights=None means
+    uniform (same distribution as random.sample).
+    """
+    if weights is None:
+        return rng.sample(items, min(k, len(items)))
+    keyed = (
+        (math.log(1.0 - rng.random()) / w, i)
+        for i, w in enumerate(weights)
+        if w > 0
+    )
+    return [items[i] for _, i in heapq.nlargest(k, keyed)]
+
+
+def get_onboarding_config(now=None, rotation=None, day_name=None):
+    """Return onboarding type for today, or None if no onboarding.
+
+    Uses the rotation's onboarding schedule, or the ONBOARDING_SCHEDULE env var
+    (format: "Monday:FTE,Tuesday:Contractor") for the default rotation.
+    day_name overrides the weekday, as in get_day_exclusions.
+    Returns: str like "FTE" or "Contractor", or None if no onboarding today
+    """
+    rotation = rotation or get_default_rotation()
+    return rotation.onboarding_schedule.get((day_name or get_day_name(now)).casefold())
 
 
-def select_onboarding(people, day_excluded_lower=None, last_onboarding=None):
+def select_onboarding(people, day_excluded=None, last_onboarding=None, weights=None):
     """Select 2 people for onboarding support.
 
     Independent selection - can overlap with HelpDesk/Operations.
-    Day exclusions still apply. People from the last onboarding run are
-    soft-excluded (re-included if the pool would be too small).
+    Day exclusions (lowercased names, or a bitset from get_day_exclusions)
+    still apply. People from the last onboarding run are soft-excluded
+    (re-included if the pool would be too small).
+    weights optionally maps person -> selection weight (default: uniform).
+    people may be a list of names or a Roster.
     """
-    day_excluded_lower = day_excluded_lower or set()
-    last_onboarding_lower = {p.casefold() for p in (last_onboarding or [])}
+    roster = get_roster(people)
+    day_excluded = roster.exclusion_mask(day_excluded or ())
+    last_onboarding = roster.ids_of(last_onboarding or [])
 
     # Filter out day-excluded people
-    available = [p for p in people if p.casefold() not in day_excluded_lower]
+    available = [i for i in range(len(roster)) if not day_excluded >> i & 1]
 
     if len(available) == 0:
         return []
 
     # Soft-exclude people from last onboarding run
-    eligible = [p for p in available if p.casefold() not in last_onboarding_lower]
+    eligible = [i for i in available if i not in last_onboarding]
     if len(eligible) < 2:
         eligible = available  # fallback: re-include if pool too small
 
-    return random.sample(eligible, min(2, len(eligible)))
+    if weights is None:
+        return roster.names_of(random.sample(eligible, min(2, len(eligible))))
+    names = roster.names
+    return roster.names_of(weighted_sample(eligible, [weights.get(names[i], 1) for i in eligible], 2))
 
 
 def should_run_now(now=None):
-    if env_truthy("FORCE_RUN"):
+    if get_config().force_run:
         return True
     if now is None:
         now = datetime.now(LOCAL_TZ)
@@ -394,14 +1071,14 @@ def get_next_workday(now=None):
 
 def should_run_preview(now=None):
     """Return True if we should run the next-day preview (5:30 PM Pacific, Mon-Fri)."""
-    if env_truthy("FORCE_PREVIEW"):
+    if get_config().force_preview:
         return True
     if now is None:
         now = datetime.now(LOCAL_TZ)
     return now.weekday() < 5 and now.hour == 17 and 25 <= now.minute < 40
 
 
-def assign_operations_by_day(ops_people, operations, day_name, last_ops):
+def assign_operations_by_day(ops_people, operations, day_name, last_ops, day_rules=None):
     """Assign operations tasks based on day rules.
 
     Everyone gets the same task types per day:
@@ -416,6 +1093,7 @@ def assign_operations_by_day(ops_people, operations, day_name, last_ops):
         operations: list of all operation tasks
         day_name: current day name (e.g., "monday")
         last_ops: dict of {person: [task_names]} from last run
+        day_rules: per-day slot types (defaults to DAY_OPS_RULES)
 
     Returns: assignments dict {person: [task1, task2]}
     """
@@ -425,17 +1103,17 @@ def assign_operations_by_day(ops_people, operations, day_name, last_ops):
         raise ValueError("No operations configured")
 
     day_lower = day_name.casefold()
-    rules = DAY_OPS_RULES.get(day_lower, ["anyday", "anyday"])
+    rules = (day_rules or DAY_OPS_RULES).get(day_lower, ["anyday", "anyday"])
     last_ops = last_ops if isinstance(last_ops, dict) else {}
 
     assignments = {p: [] for p in ops_people}
-    used_anyday = set()
 
-    onboarding = find_task_by_name(operations, "onboarding")
-    imaging = find_task_by_name(operations, "system imaging")
-    anyday_pool = get_anyday_tasks(operations)
+    catalog = get_task_catalog(operations)
+    onboarding = catalog.onboarding.raw if catalog.onboarding else None
+    imaging = catalog.imaging.raw if catalog.imaging else None
+    anyday_pool = AnydayPool(catalog.anyday)
 
-    logger.info("Day rules for %s: %s", day_name, rules)
+    logger.info("Day rules for %s: %s", day_name, list(rules))
 
     for person in ops_people:
         for slot_type in rules:
@@ -450,104 +1128,150 @@ def assign_operations_by_day(ops_people, operations, day_name, last_ops):
                 else:
                     logger.warning("System Imaging task not found in operations list")
             else:  # anyday
-                task = pick_anyday_task(anyday_pool, used_anyday, last_ops.get(person, []))
+                task = anyday_pool.take(last_ops.get(person, []))
                 if task:
-                    assignments[person].append(task)
-                    used_anyday.add(extract_task_name(task).casefold())
+                    assignments[person].append(task.raw)
                 else:
                     logger.warning("No more anyday tasks available for %s", person)
 
     return assignments
 
 
-def run_selection(people, operations, history_excluded=None, day_excluded_lower=None,
+def run_selection(people, operations, history_excluded=None, day_excluded=None,
                   reduced_ops=False, last_ops=None, weekly=None, remaining_days=5,
-                  day_name=None):
+                  day_name=None, day_rules=None, need_weight=None):
     """Select 2 people for HelpDesk and assign operations to the rest.
 
+    - people: display names, or a Roster from get_roster
     - history_excluded: soft exclusion (can be re-included for HelpDesk if short-staffed)
-    - day_excluded_lower: hard exclusion set (lowercased, completely removed from rotation)
+    - day_excluded: hard exclusion (a bitset from get_day_exclusions, or a set
+      of lowercased names; completely removed from rotation)
     - reduced_ops: if True, only assign 2 people to Operations (not all remaining)
     - last_ops: last run's operations assignments per person (for avoiding repeats)
     - weekly: weekly ServiceDesk tracking for minimum guarantee
     - remaining_days: workdays left in week for urgency calculation
     - day_name: current day name for day-based task assignment
+    - day_rules: per-day operations slot types (defaults to DAY_OPS_RULES)
+    - need_weight: selection weight for people still needing their weekly
+      assignment, > 0 (defaults to WEEKLY_NEED_WEIGHT; everyone else weighs 1)
     """
     history_excluded = history_excluded or set()
-    day_excluded_lower = day_excluded_lower or set()
     weekly = weekly or {"week": get_week_key(), "assignments": {}}
     day_name = day_name or get_day_name()
 
-    # Normalize once: map lowercased name -> original name
-    name_lookup = {p.casefold(): p for p in people}
-    history_excluded_lower = {n.casefold() for n in history_excluded}
+    # Intern once: people become roster ids, history a set of ids, day exclusions a bitset
+    roster = get_roster(people)
+    history_excluded = roster.ids_of(history_excluded)
+    day_excluded = roster.exclusion_mask(day_excluded or ())
+    config = get_config()
+    need_weight = config.weekly_need_weight if need_weight is None else need_weight
+    if need_weight <= 0:
+        raise ValueError(f"need_weight must be positive, got {need_weight}")
+
+    if len(roster) >= config.vector_selection_min_people and selection_kernel.available():
+        selected_ids, available_ids = _select_helpdesk_vectorized(
+            roster, history_excluded, day_excluded, weekly, remaining_days, need_weight
+        )
+    else:
+        selected_ids, available_ids = _select_helpdesk(
+            roster, history_excluded, day_excluded, weekly, remaining_days, need_weight
+        )
+    selected = roster.names_of(selected_ids)
+
+    # Remaining people for Operations
+    selected_set = set(selected_ids)
+    remaining_ids = [i for i in available_ids if i not in selected_set]
+
+    # On reduced ops days: only assign 2 people to Operations
+    if reduced_ops and len(remaining_ids) > 2:
+        remaining_ids = random.sample(remaining_ids, 2)
 
+    remaining = roster.names_of(remaining_ids)
+    assignments = assign_operations_by_day(remaining, operations, day_name, last_ops, day_rules)
+    return selected, assignments
+
+
+def _select_helpdesk(roster, history_excluded, day_excluded, weekly, remaining_days, need_weight):
+    """Pure-Python Service Desk draw over roster ids. Returns (selected ids, available ids)."""
     # Remove day-excluded people entirely from today's rotation
-    available_keys = [k for k in name_lookup if k not in day_excluded_lower]
+    available_ids = [i for i in range(len(roster)) if not day_excluded >> i & 1]
 
-    # Get people who still need their weekly ServiceDesk assignment
-    people_needing = get_people_needing_weekly_assignment(weekly, people)
-    people_needing_available = people_needing - day_excluded_lower
+    # Available people who still need their weekly ServiceDesk assignment
+    weekly_counts = roster.weekly_counts(weekly)
+    people_needing_available = {i for i in available_ids if i not in weekly_counts}
 
     # Apply history exclusions (soft - can be overridden if short-staffed)
-    eligible_keys = [k for k in available_keys if k not in history_excluded_lower]
+    eligible_ids = [i for i in available_ids if i not in history_excluded]
 
     # Fallback: if <2 eligible, re-include history-excluded (but NOT day-excluded)
-    if len(eligible_keys) < 2:
-        eligible_keys = available_keys[:]
+    if len(eligible_ids) < 2:
+        eligible_ids = available_ids[:]
 
     # Calculate weekly priority
     must_prioritize, priority_pool = calculate_weekly_priority(
-        eligible_keys, people_needing_available, remaining_days
+        eligible_ids, people_needing_available, remaining_days
     )
 
-    num_helpdesk = min(2, len(eligible_keys))
+    num_helpdesk = min(2, len(eligible_ids))
 
     if must_prioritize and priority_pool:
         # MUST select from those who need weekly assignment (Thu/Fri urgency)
         num_from_priority = min(num_helpdesk, len(priority_pool))
-        selected_keys = random.sample(priority_pool, num_from_priority)
+        selected_ids = random.sample(priority_pool, num_from_priority)
 
         if num_from_priority < num_helpdesk:
-            others = [k for k in eligible_keys if k not in selected_keys]
+            others = [i for i in eligible_ids if i not in selected_ids]
             if others:
-                selected_keys.append(random.choice(others))
+                selected_ids.append(random.choice(others))
 
         logger.info(
             "Weekly minimum enforcement: prioritizing %s",
-            [name_lookup[k] for k in selected_keys if k in priority_pool]
+            roster.names_of(i for i in selected_ids if i in priority_pool)
         )
     elif people_needing_available:
-        # PREFER those needing assignment (weighted random, 3x weight)
-        weighted_pool = []
-        for k in eligible_keys:
-            weight = 3 if k in people_needing_available else 1
-            weighted_pool.extend([k] * weight)
-        random.shuffle(weighted_pool)
-
-        selected_keys = []
-        for k in weighted_pool:
-            if k not in selected_keys:
-                selected_keys.append(k)
-                if len(selected_keys) == num_helpdesk:
-                    break
+        # PREFER those needing assignment (weighted random, 3x weight by default)
+        weights = [need_weight if i in people_needing_available else 1 for i in eligible_ids]
+        selected_ids = weighted_sample(eligible_ids, weights, num_helpdesk)
     else:
         # All have met weekly minimum - standard random selection
-        shuffled_keys = random.sample(eligible_keys, len(eligible_keys))
-        selected_keys = shuffled_keys[:num_helpdesk]
+        shuffled_ids = random.sample(eligible_ids, len(eligible_ids))
+        selected_ids = shuffled_ids[:num_helpdesk]
 
-    selected = [name_lookup[k] for k in selected_keys]
+    return selected_ids, available_ids
 
-    # Remaining people for Operations
-    remaining_keys = [k for k in available_keys if k not in selected_keys]
 
-    # On reduced ops days: only assign 2 people to Operations
-    if reduced_ops and len(remaining_keys) > 2:
-        remaining_keys = random.sample(remaining_keys, 2)
+def _select_helpdesk_vectorized(roster, history_excluded, day_excluded, weekly, remaining_days,
+                                need_weight):
+    """Same draw as _select_helpdesk, as one row of the NumPy kernel.
 
-    remaining = [name_lookup[k] for k in remaining_keys]
-    assignments = assign_operations_by_day(remaining, operations, day_name, last_ops)
-    return selected, assignments
+    The day-exclusion bitset is unpacked straight into a bool array; history
+    exclusions and weekly counts are small next to a large roster, so those
+    arrays are filled from the id sets rather than by testing every person.
+    """
+    np = selection_kernel.np
+    n = len(roster)
+    day_mask = np.unpackbits(
+        np.frombuffer(day_excluded.to_bytes((n + 7) // 8, "little"), dtype=np.uint8),
+        count=n, bitorder="little",
+    ).astype(bool)
+    history_mask = np.zeros(n, dtype=bool)
+    history_mask[list(history_excluded)] = True
+    counts = np.zeros(n, dtype=np.int64)
+    weekly_counts = roster.weekly_counts(weekly)
+    counts[list(weekly_counts)] = list(weekly_counts.values())
+
+    # Seeded from the module RNG so random.seed() still makes runs reproducible
+    rng = np.random.default_rng(random.getrandbits(64))
+    drawn, prioritized = selection_kernel.select_helpdesk(
+        day_mask, history_mask, counts, remaining_days, need_weight, k=2, rng=rng
+    )
+    selected_ids = [i for i in drawn.tolist() if i >= 0]
+    if prioritized:
+        logger.info(
+            "Weekly minimum enforcement: prioritizing %s",
+            roster.names_of(i for i in selected_ids if i not in weekly_counts)
+        )
+    return selected_ids, np.flatnonzero(~day_mask).tolist()
 
 
 def format_message(selected, assignments, onboarding_people=None, onboarding_type=None):
@@ -562,8 +1286,8 @@ def format_message(selected, assignments, onboarding_people=None, onboarding_typ
     if assignments:
         for person, operations in assignments.items():
             lines.append(f"    {person}")
-            lines.append(f"        • {operations[0]}")
-            lines.append(f"        • {operations[1]}")
+            for task in operations:
+                lines.append(f"        • {task}")
     else:
         lines.append("    (none)")
 
@@ -607,45 +1331,355 @@ def format_preview_message(selected, assignments, onboarding_people=None,
     return "\n".join(lines)
 
 
-def send_to_slack(message):
-    if not SLACK_WEBHOOK_URL:
+# send_to_slack outcomes
+DELIVERED = "delivered"  # accepted on the first attempt
+RETRIED = "retried"      # accepted after one or more retries
+DROPPED = "dropped"      # not delivered (no webhook, permanent error, or retries exhausted)
+QUEUED = "queued"        # stored in the outbox for the background worker
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# requests timeout per phase (connect, then read) of one Slack POST, in seconds
+SLACK_TIMEOUT = 10
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """Return the shared keep-alive session used for Slack webhooks."""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests  # deferred: only needed once something is sent
+
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def get_retry_delay(attempt, response=None):
+    """Seconds to wait before retry number `attempt` (0-based).
+
+    Honours Slack's Retry-After header as given (post_to_slack decides whether
+    to wait that long); otherwise exponential backoff with full jitter, capped
+    at SLACK_BACKOFF_MAX.
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            delay = -1
+        if 0 <= delay < float("inf"):
+            return delay
+    config = get_config()
+    return random.uniform(0, min(config.slack_backoff_max, config.slack_backoff_base * 2 ** attempt))
+
+
+def post_to_slack(message, webhook_url=None, defer=False):
+    """Post a message to Slack, retrying 429/5xx and connection errors.
+
+    Waits between attempts never exceed SLACK_BACKOFF_MAX, so one 429 can't
+    stall the caller. A Retry-After longer than that is never cut short: with
+    `defer` (outbox delivery) it is handed back as an outbox.RetryLater and the
+    outbox reschedules the message; otherwise the message is dropped.
+
+    Returns: DELIVERED, RETRIED, DROPPED, or RetryLater when deferred
+    """
+    config = get_config()
+    webhook_url = webhook_url or config.default_rotation.webhook_url
+    if not webhook_url:
         logger.warning("No SLACK_WEBHOOK_URL set. Message would be:\n%s", message)
-        return
+        return DROPPED
+
+    import requests
+
+    session = get_http_session()
+    for attempt in range(config.slack_max_retries + 1):
+        response = None
+        try:
+            response = session.post(webhook_url, json={"text": message}, timeout=SLACK_TIMEOUT)
+            if response.status_code not in RETRYABLE_STATUS:
+                response.raise_for_status()
+                logger.info("Message sent to Slack")
+                return RETRIED if attempt else DELIVERED
+            logger.warning("Slack returned %s (attempt %d)", response.status_code, attempt + 1)
+        except (requests.ConnectionError, requests.Timeout):
+            logger.warning("Slack request failed (attempt %d)", attempt + 1, exc_info=True)
+        except requests.RequestException:
+            logger.exception("Failed to send message to Slack")
+            return DROPPED
+
+        delay = get_retry_delay(attempt, response)
+        if delay > config.slack_backoff_max:
+            if defer:
+                from outbox import RetryLater
+
+                return RetryLater(delay)
+            logger.error("Dropping Slack message: Slack asked to wait %.0fs (over SLACK_BACKOFF_MAX)", delay)
+            return DROPPED
+        if attempt < config.slack_max_retries:
+            check_deadline("retrying a Slack post")
+            time.sleep(delay)
+
+    logger.error("Dropping Slack message after %d attempts", config.slack_max_retries + 1)
+    return DROPPED
+
+
+def slack_post_seconds(config=None):
+    """Upper bound on how long one post_to_slack call can take, in seconds.
+
+    Every attempt may spend SLACK_TIMEOUT connecting and again reading, and
+    every retry may wait up to SLACK_BACKOFF_MAX before it.
+    """
+    config = config or get_config()
+    attempts = config.slack_max_retries + 1
+    return attempts * 2 * SLACK_TIMEOUT + config.slack_max_retries * config.slack_backoff_max
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox():
+    """Return the shared Outbox, or None if the outbox file can't be opened."""
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                from outbox import Outbox
+                try:
+                    # Twice the longest delivery, so a slow but live sender keeps its
+                    # claim and another worker doesn't post the same message again
+                    _outbox = Outbox(
+                        OUTBOX_FILE, functools.partial(post_to_slack, defer=True),
+                        success={DELIVERED, RETRIED}, lease_seconds=2 * slack_post_seconds(),
+                    )
+                except sqlite3.Error:
+                    logger.warning("Could not open outbox %s; posting directly", OUTBOX_FILE)
+                    return None
+    return _outbox
+
+
+def get_message_key(run_type, target_date, rotation_name=None):
+    """Idempotency key for an announcement, e.g. "preview:2026-02-25".
+
+    Non-default rotations are included ("preview:bayside:2026-02-25"). Forced
+    runs get a unique suffix so manual re-runs still post.
+    """
+    key = f"{run_type}:{rotation_name}:{target_date}" if rotation_name else f"{run_type}:{target_date}"
+    config = get_config()
+    if config.force_run or config.force_preview or config.force_reselect:
+        key += f":forced:{time.time_ns()}"
+    return key
+
+
+def send_to_slack(message, key=None, webhook_url=None):
+    """Send a message through the durable outbox.
+
+    With a background worker running (server.py) this only enqueues and returns
+    QUEUED, so selection never waits on Slack. Otherwise pending messages are
+    delivered inline and this message's outcome is returned.
+
+    Args:
+        message: text to post
+        key: idempotency key (see get_message_key); a key that was already
+            queued or sent is not posted again
+        webhook_url: overrides SLACK_WEBHOOK_URL
+    """
+    check_deadline("sending to Slack")
+    webhook_url = webhook_url or get_config().default_rotation.webhook_url
+    if not webhook_url:
+        logger.warning("No SLACK_WEBHOOK_URL set. Message would be:\n%s", message)
+        return DROPPED
+
+    outbox = get_outbox() if key else None
+    if outbox is None:
+        return post_to_slack(message, webhook_url)
+
+    try:
+        outbox.enqueue(key, message, webhook_url)
+        if outbox.running:
+            return QUEUED
+        outcomes = outbox.drain()
+    except sqlite3.Error:
+        logger.exception("Outbox unavailable; posting directly")
+        return post_to_slack(message, webhook_url)
+    if outcomes.get(key) in (DELIVERED, RETRIED):
+        return outcomes[key]
+    # Not delivered yet: it stays queued for the next drain unless it ran out of attempts
+    status = outbox.status(key)
+    if status == "sent":
+        return DELIVERED
+    return DROPPED if status == "failed" else QUEUED
+
+
+def plan_schedule(rotation=None, start=None, weeks=1):
+    """Compute Service Desk, operations and onboarding for `weeks` weeks of workdays.
+
+    Runs the same selection as the daily runs, one workday at a time from
+    `start` (default: the next workday), carrying history, weekly counts,
+    last ops and last onboarding forward in memory. Day exclusions, date and
+    range overrides, weekly minimums and reduced-ops days all apply.
+
+    Returns: list of day entries shaped like the preview
+        ({"target_date", "selected", "assignments", "onboarding_people", "onboarding_type"})
+    """
+    rotation = rotation or get_default_rotation()
+    if start is None:
+        start = get_next_workday(datetime.now(LOCAL_TZ))
+    elif start.weekday() > 4:
+        start = get_next_workday(start)
+
+    history, last_ops, weekly, _, last_onboarding = load_history(rotation.namespace)
+    weekly = {"week": weekly["week"], "assignments": dict(weekly["assignments"])}
+    catalog = get_task_catalog(rotation.operations)
+
+    days = []
+    day = start
+    for _ in range(weeks * 5):
+        # Weekday and remaining workdays come from the planned day itself, even with SIMULATE_DAY set
+        day_name = day.strftime("%A").casefold()
+        week_key = get_week_key(day)
+        if weekly["week"] != week_key:
+            weekly = {"week": week_key, "assignments": {}}
+
+        _, day_excluded = get_day_exclusions(day, rotation, day_name)
+        selected, assignments = run_selection(
+            rotation.roster, rotation.operations, get_excluded_people(history),
+            day_excluded, day_name in rotation.reduced_ops_days, last_ops, weekly,
+            5 - day.weekday(), day_name, rotation.day_ops_rules
+        )
+        onboarding_type = get_onboarding_config(day, rotation, day_name)
+        onboarding_people = []
+        if onboarding_type:
+            onboarding_people = select_onboarding(rotation.roster, day_excluded, last_onboarding)
+
+        days.append({
+            "target_date": day.strftime("%Y-%m-%d"),
+            "selected": selected,
+            "assignments": {p: list(tasks) for p, tasks in assignments.items()},
+            "onboarding_people": onboarding_people,
+            "onboarding_type": onboarding_type,
+        })
+
+        # Advance the simulated state exactly as save_history would
+        history = (history + [selected])[-2:]
+        if assignments:
+            last_ops = {p: [catalog.key_of(t) for t in tasks] for p, tasks in assignments.items()}
+        for person in selected:
+            weekly["assignments"][person] = weekly["assignments"].get(person, 0) + 1
+        if onboarding_people:
+            last_onboarding = onboarding_people
+        day = get_next_workday(day)
+
+    return days
+
+
+def get_planned_day(rotation, date_str, day_excluded, history_excluded=()):
+    """Return the persisted plan entry for a date, or None.
+
+    Entries naming someone who has since become unavailable (day_excluded is
+    the bitset from get_day_exclusions) are ignored so the caller falls back
+    to a fresh selection. So are entries that put someone on Service Desk a
+    third day in a row given the history that actually ran (history_excluded,
+    from get_excluded_people), which can happen once an earlier planned day
+    was re-selected.
+    """
+    entry = load_plan(rotation.namespace).get(date_str)
+    if not entry:
+        return None
+    planned = set(entry.get("selected", [])) | set(entry.get("assignments", {}))
+    planned |= set(entry.get("onboarding_people") or [])
+    roster = rotation.roster
+    if roster.mask_of(planned) & day_excluded:
+        now_unavailable = {p for p in planned if roster.mask_of([p]) & day_excluded}
+        logger.info("[%s] Ignoring plan for %s: %s now unavailable",
+                    rotation.name, date_str, sorted(now_unavailable))
+        return None
+    repeated = set(entry.get("selected", [])) & set(history_excluded)
+    if repeated:
+        logger.info("[%s] Ignoring plan for %s: %s already selected 2x in a row",
+                    rotation.name, date_str, sorted(repeated))
+        return None
+    return entry
+
 
+def format_week_message(days):
+    """Format a multi-day plan as one Slack message."""
+    first = datetime.strptime(days[0]["target_date"], "%Y-%m-%d")
+    last = datetime.strptime(days[-1]["target_date"], "%Y-%m-%d")
+    lines = [f"🗓️ *Week Ahead ({first:%b %-d} – {last:%b %-d})*"]
+    for entry in days:
+        day = datetime.strptime(entry["target_date"], "%Y-%m-%d")
+        lines.append("")
+        lines.append(f"*{day:%A, %b %-d}*")
+        lines.append(f"🖥️ Service Desk: {', '.join(entry['selected']) or '(none)'}")
+        lines.append("⚙️ Operations")
+        if entry["assignments"]:
+            for person, tasks in entry["assignments"].items():
+                lines.append(f"    {person}: {', '.join(tasks)}")
+        else:
+            lines.append("    (none)")
+        if entry.get("onboarding_people"):
+            lines.append(
+                f"👋 Onboarding Support ({entry['onboarding_type']}): {', '.join(entry['onboarding_people'])}"
+            )
+    return "\n".join(lines)
+
+
+def run_plan(rotation=None, weeks=1, publish=True):
+    """Plan the coming week(s) for a rotation, persist the plan and optionally post it."""
+    rotation = rotation or get_default_rotation()
+    if not rotation.people:
+        logger.error("[%s] No PEOPLE configured; skipping plan.", rotation.name)
+        return []
+    days = plan_schedule(rotation, weeks=weeks)
+    if not days:
+        logger.error("[%s] Nothing to plan for %r week(s)", rotation.name, weeks)
+        return []
+    logger.info("[%s] Planned %d workdays (%s to %s)", rotation.name, len(days),
+                days[0]["target_date"], days[-1]["target_date"])
     try:
-        response = requests.post(
-            SLACK_WEBHOOK_URL,
-            json={"text": message},
-            timeout=10,
+        save_plan({entry["target_date"]: entry for entry in days}, rotation.namespace)
+    except OSError:
+        logger.warning("Could not save plan (read-only filesystem?)")
+    if publish:
+        send_to_slack(
+            format_week_message(days),
+            get_message_key("plan", days[0]["target_date"], rotation.namespace or None),
+            rotation.webhook_url,
         )
-        response.raise_for_status()
-        logger.info("Message sent to Slack")
-    except requests.RequestException:
-        logger.exception("Failed to send message to Slack")
+    return days
 
 
-def run_preview():
+def run_preview(rotation=None):
     """Run next-day selection at 5:30 PM and post preview to Slack."""
+    rotation = rotation or get_default_rotation()
     now = datetime.now(LOCAL_TZ)
     next_wd = get_next_workday(now)
     target_date = next_wd.strftime("%Y-%m-%d")
     target_day_name = next_wd.strftime("%A")
     day_name = target_day_name.casefold()
 
-    logger.info("Running preview for %s (%s)", target_day_name, target_date)
+    logger.info("[%s] Running preview for %s (%s)", rotation.name, target_day_name, target_date)
 
-    people = get_config_list("PEOPLE", PEOPLE)
-    operations = get_config_list("OPERATIONS", OPERATIONS)
+    people = rotation.people
+    operations = rotation.operations
 
     if not people:
-        logger.error("No PEOPLE configured; skipping preview.")
+        logger.error("[%s] No PEOPLE configured; skipping preview.", rotation.name)
         return
 
     # Load current history (today's state)
-    history, last_ops, weekly, _, last_onboarding = load_history()
+    history, last_ops, weekly, _, last_onboarding = load_history(rotation.namespace)
 
     # Get exclusions for the TARGET day (tomorrow)
-    day_excluded, day_excluded_lower = get_day_exclusions(next_wd)
+    excluded_names, day_excluded = get_day_exclusions(next_wd, rotation)
 
     # Handle week boundary (e.g., Friday preview for Monday)
     target_week = get_week_key(next_wd)
@@ -656,34 +1690,44 @@ def run_preview():
     history_excluded = get_excluded_people(history)
     if history_excluded:
         logger.info("Preview excluding from HelpDesk (selected 2x in a row): %s", history_excluded)
-    if day_excluded:
-        logger.info("Preview excluding from rotation (%s unavailable): %s", target_day_name, day_excluded)
-
-    remaining_days = get_remaining_workdays(next_wd)
-    logger.info("Preview remaining workdays in target week: %d", remaining_days)
-
-    # Check reduced ops for target day
-    reduced_ops_days = parse_env_list(os.environ.get("REDUCED_OPS_DAYS", DEFAULT_REDUCED_OPS_DAYS))
-    reduced_ops_days_lower = {d.casefold() for d in reduced_ops_days}
-    is_reduced_ops_day = day_name in reduced_ops_days_lower
-
-    try:
-        selected, assignments = run_selection(
-            people, operations, history_excluded, day_excluded_lower,
-            is_reduced_ops_day, last_ops, weekly, remaining_days, day_name
-        )
-    except ValueError as exc:
-        logger.error("Configuration error during preview: %s", exc)
-        return
+    if excluded_names:
+        logger.info("Preview excluding from rotation (%s unavailable): %s", target_day_name, excluded_names)
+
+    planned = None
+    if not get_config().force_reselect:
+        planned = get_planned_day(rotation, target_date, day_excluded, history_excluded)
+
+    if planned:
+        logger.info("[%s] Using planned assignments for %s", rotation.name, target_date)
+        selected = planned["selected"]
+        assignments = planned["assignments"]
+        onboarding_people = planned.get("onboarding_people") or []
+        onboarding_type = planned.get("onboarding_type")
+    else:
+        remaining_days = get_remaining_workdays(next_wd)
+        logger.info("Preview remaining workdays in target week: %d", remaining_days)
 
-    # Check onboarding for target day
-    onboarding_type = get_onboarding_config(next_wd)
-    onboarding_people = []
-    if onboarding_type:
-        onboarding_people = select_onboarding(people, day_excluded_lower, last_onboarding)
-        logger.info("Preview onboarding (%s): %s", onboarding_type, onboarding_people)
+        # Check reduced ops for target day
+        is_reduced_ops_day = day_name in rotation.reduced_ops_days
 
-    logger.info("Preview selected for Service Desk: %s", selected)
+        try:
+            selected, assignments = run_selection(
+                rotation.roster, operations, history_excluded, day_excluded,
+                is_reduced_ops_day, last_ops, weekly, remaining_days, day_name,
+                rotation.day_ops_rules
+            )
+        except ValueError as exc:
+            logger.error("[%s] Configuration error during preview: %s", rotation.name, exc)
+            return
+
+        # Check onboarding for target day
+        onboarding_type = get_onboarding_config(next_wd, rotation)
+        onboarding_people = []
+        if onboarding_type:
+            onboarding_people = select_onboarding(rotation.roster, day_excluded, last_onboarding)
+            logger.info("Preview onboarding (%s): %s", onboarding_type, onboarding_people)
+
+    logger.info("[%s] Preview selected for Service Desk: %s", rotation.name, selected)
 
     # Save preview (preserves existing history fields)
     preview_data = {
@@ -694,62 +1738,59 @@ def run_preview():
         "onboarding_type": onboarding_type,
     }
     try:
-        save_preview(preview_data)
+        save_preview(preview_data, rotation.namespace)
     except OSError:
         logger.warning("Could not save preview (read-only filesystem?)")
 
     message = format_preview_message(
         selected, assignments, onboarding_people, onboarding_type, target_day_name
     )
-    send_to_slack(message)
-
-
-def main():
-    # Check for preview run first (5:30 PM)
-    if should_run_preview():
-        run_preview()
-        return
+    send_to_slack(
+        message,
+        get_message_key("preview", target_date, rotation.namespace or None),
+        rotation.webhook_url,
+    )
 
-    if not should_run_now():
-        logger.info(
-            "Skipping run; not scheduled local time. Set FORCE_RUN=1 to override."
-        )
-        return
 
-    people = get_config_list("PEOPLE", PEOPLE)
-    operations = get_config_list("OPERATIONS", OPERATIONS)
+def run_morning(rotation=None):
+    """Run the 9:00 AM announcement, reusing the locked-in preview when there is one."""
+    rotation = rotation or get_default_rotation()
+    people = rotation.people
+    operations = rotation.operations
 
     if not people:
-        logger.error("No PEOPLE configured; skipping.")
+        logger.error("[%s] No PEOPLE configured; skipping.", rotation.name)
         return
 
     # Load history and get exclusions
-    history, last_ops, weekly, preview, last_onboarding = load_history()
-    logger.info("Weekly ServiceDesk counts: %s", weekly.get("assignments", {}))
+    history, last_ops, weekly, preview, last_onboarding = load_history(rotation.namespace)
+    logger.info("[%s] Weekly ServiceDesk counts: %s", rotation.name, weekly.get("assignments", {}))
 
     # Check for locked-in preview from last night's 5:30 PM run
     now = datetime.now(LOCAL_TZ)
     today_str = now.strftime("%Y-%m-%d")
+    message_key = get_message_key("morning", today_str, rotation.namespace or None)
     use_preview = (
         preview
         and preview.get("target_date") == today_str
-        and not env_truthy("FORCE_RESELECT")
+        and not get_config().force_reselect
     )
 
     if use_preview:
-        logger.info("Using locked-in preview for %s", today_str)
+        logger.info("[%s] Using locked-in preview for %s", rotation.name, today_str)
         selected = preview["selected"]
         assignments = preview["assignments"]
         onboarding_people = preview.get("onboarding_people", [])
         onboarding_type = preview.get("onboarding_type")
 
         message = format_message(selected, assignments, onboarding_people, onboarding_type)
-        send_to_slack(message)
+        send_to_slack(message, message_key, rotation.webhook_url)
 
         # Save history to update last_selections and weekly counts (also clears preview)
         try:
             save_history(selected, history, assignments, prev_ops=last_ops, weekly=weekly,
-                         onboarding_people=onboarding_people if onboarding_people else last_onboarding)
+                         onboarding_people=onboarding_people if onboarding_people else last_onboarding,
+                         namespace=rotation.namespace, operations=operations)
         except OSError:
             logger.warning("Could not save selection history (read-only filesystem?)")
         return
@@ -757,7 +1798,7 @@ def main():
     if preview and preview.get("target_date") != today_str:
         logger.info("Stale preview found (target: %s, today: %s); running fresh selection",
                      preview.get("target_date"), today_str)
-    elif env_truthy("FORCE_RESELECT"):
+    elif get_config().force_reselect:
         logger.info("FORCE_RESELECT set; ignoring preview and re-randomizing")
 
     # Normal selection flow (no preview or stale/overridden preview)
@@ -766,47 +1807,174 @@ def main():
         logger.info("Excluding from HelpDesk (selected 2x in a row): %s", history_excluded)
 
     # Get day-specific exclusions (completely removed from rotation)
-    day_excluded, day_excluded_lower = get_day_exclusions(now)
-    if day_excluded:
-        logger.info("Excluding from rotation (unavailable today): %s", day_excluded)
+    excluded_names, day_excluded = get_day_exclusions(now, rotation)
+    if excluded_names:
+        logger.info("Excluding from rotation (unavailable today): %s", excluded_names)
+
+    planned = None
+    if not get_config().force_reselect:
+        planned = get_planned_day(rotation, today_str, day_excluded, history_excluded)
+
+    if planned:
+        logger.info("[%s] Using planned assignments for %s", rotation.name, today_str)
+        selected = planned["selected"]
+        assignments = planned["assignments"]
+        onboarding_people = planned.get("onboarding_people") or []
+        onboarding_type = planned.get("onboarding_type")
+    else:
+        # Calculate remaining workdays for weekly minimum enforcement
+        remaining_days = get_remaining_workdays(now)
+        logger.info("Remaining workdays this week: %d", remaining_days)
 
-    # Calculate remaining workdays for weekly minimum enforcement
-    remaining_days = get_remaining_workdays(now)
-    logger.info("Remaining workdays this week: %d", remaining_days)
+        # Check if today is a reduced operations day (2+2 instead of 2+3)
+        today_name = get_day_name(now).casefold()  # e.g., "monday"
+        is_reduced_ops_day = today_name in rotation.reduced_ops_days
 
-    # Check if today is a reduced operations day (2+2 instead of 2+3)
-    reduced_ops_days = parse_env_list(os.environ.get("REDUCED_OPS_DAYS", DEFAULT_REDUCED_OPS_DAYS))
-    reduced_ops_days_lower = {d.casefold() for d in reduced_ops_days}
-    today_name = get_day_name(now).casefold()  # e.g., "monday"
-    is_reduced_ops_day = today_name in reduced_ops_days_lower
+        try:
+            selected, assignments = run_selection(
+                rotation.roster, operations, history_excluded, day_excluded,
+                is_reduced_ops_day, last_ops, weekly, remaining_days,
+                today_name, rotation.day_ops_rules
+            )
+        except ValueError as exc:
+            logger.error("[%s] Configuration error: %s", rotation.name, exc)
+            return
+
+        # Check for onboarding today
+        onboarding_type = get_onboarding_config(now, rotation)
+        onboarding_people = []
+        if onboarding_type:
+            onboarding_people = select_onboarding(rotation.roster, day_excluded, last_onboarding)
+            logger.info("Onboarding (%s): %s", onboarding_type, onboarding_people)
 
+    message = format_message(selected, assignments, onboarding_people, onboarding_type)
+    send_to_slack(message, message_key, rotation.webhook_url)
+
+    # Save selection history (best-effort, don't crash if filesystem is read-only)
     try:
-        selected, assignments = run_selection(
-            people, operations, history_excluded, day_excluded_lower,
-            is_reduced_ops_day, last_ops, weekly, remaining_days,
-            today_name
+        save_history(selected, history, assignments, prev_ops=last_ops, weekly=weekly,
+                     onboarding_people=onboarding_people if onboarding_people else last_onboarding,
+                     namespace=rotation.namespace, operations=operations)
+    except OSError:
+        logger.warning("Could not save selection history (read-only filesystem?)")
+
+
+def main():
+    # Check for preview run first (5:30 PM)
+    if should_run_preview():
+        run = run_preview
+    elif should_run_now():
+        run = run_morning
+    else:
+        logger.info(
+            "Skipping run; not scheduled local time. Set FORCE_RUN=1 to override."
         )
+        return
+
+    try:
+        rotations = get_rotations()
     except ValueError as exc:
-        logger.error("Configuration error: %s", exc)
+        logger.error("Invalid rotations configuration: %s", exc)
         return
 
-    # Check for onboarding today
-    onboarding_type = get_onboarding_config(now)
-    onboarding_people = []
-    if onboarding_type:
-        onboarding_people = select_onboarding(people, day_excluded_lower, last_onboarding)
-        logger.info("Onboarding (%s): %s", onboarding_type, onboarding_people)
+    run_rotations(run, rotations)
 
-    message = format_message(selected, assignments, onboarding_people, onboarding_type)
-    send_to_slack(message)
 
-    # Save selection history (best-effort, don't crash if filesystem is read-only)
+def load_last_run():
+    """Per-rotation outcome of the most recent run_rotations() call in any process.
+
+    Returns: {name: {"status": "ok" | "failed" | "timeout", "seconds": float}}
+    """
+    data = state.load_json(LAST_RUN_FILE, {})
+    return data if isinstance(data, dict) else {}
+
+
+class RotationTimeout(Exception):
+    """A rotation reached a side effect after its ROTATION_TIMEOUT deadline."""
+
+
+_rotation_deadline = threading.local()
+
+
+def check_deadline(action):
+    """Raise RotationTimeout if this thread's rotation is past its deadline.
+
+    Called before each side effect (saving a preview or plan, sending to Slack)
+    so a rotation that overran stops there instead of posting late. Outside
+    run_rotations there is no deadline and this does nothing.
+    """
+    deadline = getattr(_rotation_deadline, "at", None)
+    if deadline is not None and time.monotonic() > deadline:
+        raise RotationTimeout(f"deadline passed before {action}")
+
+
+def run_rotations(run, rotations, max_workers=None, timeout=None):
+    """Run `run(rotation)` for each rotation on a bounded thread pool.
+
+    Total time tracks the slowest rotation rather than the sum. Each rotation
+    gets `timeout` seconds from when it starts; past that it stops at its next
+    side effect (see check_deadline) and is reported as "timeout". The timeout
+    cannot interrupt a rotation mid-call, so a rotation blocked in IO keeps its
+    worker until that call returns and queued rotations wait behind it.
+
+    Returns: {rotation name: {"status": "ok" | "failed" | "timeout", "seconds": ...}}
+    """
+    config = get_config()
+    max_workers = max(1, max_workers or config.rotation_workers)
+    timeout = timeout or config.rotation_timeout
+    stats = {}
+
+    def timed(rotation):
+        started = time.monotonic()
+        _rotation_deadline.at = started + timeout
+        status = "ok"
+        try:
+            run(rotation)
+        except RotationTimeout as exc:
+            logger.error("[%s] Rotation run exceeded %ss: %s", rotation.name, timeout, exc)
+            status = "timeout"
+        except Exception:
+            logger.exception("[%s] Rotation run failed", rotation.name)
+            status = "failed"
+        finally:
+            _rotation_deadline.at = None
+            stats[rotation.name] = {"status": status, "seconds": round(time.monotonic() - started, 3)}
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(max_workers, len(rotations) or 1), thread_name_prefix="rotation"
+    ) as executor:
+        for rotation in rotations:
+            executor.submit(timed, rotation)
+
+    for name, stat in stats.items():
+        logger.info("[%s] Rotation finished: %s in %.3fs", name, stat["status"], stat["seconds"])
     try:
-        save_history(selected, history, assignments, prev_ops=last_ops, weekly=weekly,
-                     onboarding_people=onboarding_people if onboarding_people else last_onboarding)
+        state.write_json(LAST_RUN_FILE, stats, indent=2)
     except OSError:
-        logger.warning("Could not save selection history (read-only filesystem?)")
+        logger.warning("Could not save run stats (read-only filesystem?)")
+    return stats
+
+
+def plan_main(argv):
+    """CLI: python bot.py plan [weeks] -- plan every rotation and post the week ahead."""
+    try:
+        weeks = int(argv[0]) if argv else 1
+    except ValueError:
+        weeks = 0
+    if weeks < 1:
+        raise SystemExit("usage: python bot.py plan [weeks]  (weeks must be a whole number >= 1)")
+    try:
+        rotations = get_rotations()
+    except ValueError as exc:
+        logger.error("Invalid rotations configuration: %s", exc)
+        return
+    run_rotations(lambda rotation: run_plan(rotation, weeks), rotations)
 
 
 if __name__ == "__main__":
-    main()
+    import sys
+
+    if sys.argv[1:2] == ["plan"]:
+        plan_main(sys.argv[2:])
+    else:
+        main()
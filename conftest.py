@@ -0,0 +1 @@
+"""Makes the repo root importable (bot, server, ...) when tests run under plain `pytest`."""
@@ -0,0 +1,30 @@
+"""gunicorn settings for production (railway.toml); `python server.py` is the development server.
+
+    gunicorn -c gunicorn.conf.py server:app
+
+Each worker imports server.py itself (no preload: the scheduler's threads
+would not survive the fork) and then calls start_background_jobs(), which
+elects a single scheduler leader among the workers via SCHEDULER_LOCK_FILE.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("WEB_THREADS", "4"))
+worker_class = "gthread"
+preload_app = False
+# A leader finishing a bot run on shutdown waits for it (stop_background_jobs)
+graceful_timeout = 60
+accesslog = "-"
+
+
+def post_worker_init(worker):
+    import server
+
+    server.start_background_jobs()
+
+
+def worker_exit(arbiter, worker):
+    import server
+
+    server.stop_background_jobs()
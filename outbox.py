@@ -0,0 +1,198 @@
+"""Durable outbound message queue for Slack posts.
+
+Messages are written to a small SQLite file before delivery and only marked
+sent after Slack accepts them, so a restart mid-send re-delivers instead of
+losing the announcement (at-least-once). Each message carries an idempotency
+key (run type + target date); enqueueing a key that already exists is a no-op,
+so duplicate scheduler fires or workers don't double-post.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    webhook_url TEXT NOT NULL,
+    text TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class RetryLater:
+    """Outcome a `deliver` function returns to have the message retried after `delay` seconds."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __repr__(self):
+        return f"RetryLater({self.delay!r})"
+
+
+class Outbox:
+    """SQLite-backed outbox with an optional background delivery thread.
+
+    Args:
+        path: SQLite file for the queue
+        deliver: function(text, webhook_url) -> outcome string; anything in
+            `success` counts as delivered, everything else is retried later
+            (after `outcome.delay` seconds when it returns a RetryLater)
+        success: outcomes that mark a message as sent
+        max_attempts: delivery rounds before a message is marked failed
+        lease_seconds: how long a claimed message may stay "sending" before
+            another worker assumes the sender died and retries it; must be
+            longer than the slowest `deliver` call or messages get posted twice
+    """
+
+    def __init__(self, path, deliver, success, max_attempts=10, lease_seconds=120,
+                 poll_interval=5.0):
+        self.path = path
+        self.deliver = deliver
+        self.success = set(success)
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def enqueue(self, key, text, webhook_url):
+        """Queue a message. Returns False if the key was already queued or sent."""
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO outbox (key, webhook_url, text, status, created_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, webhook_url, text, PENDING, now, now),
+            )
+            added = cur.rowcount == 1
+        if added:
+            self._wake.set()
+        else:
+            logger.info("Outbox already has message %s; not queueing again", key)
+        return added
+
+    def status(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT status FROM outbox WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _claim(self):
+        """Atomically claim the oldest due message. Returns (key, text, webhook_url, attempts) or None."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT key, text, webhook_url, attempts FROM outbox "
+                "WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND claimed_at <= ?) "
+                "ORDER BY created_at LIMIT 1",
+                (PENDING, now, SENDING, now - self.lease_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE outbox SET status = ?, claimed_at = ?, attempts = attempts + 1 WHERE key = ?",
+                (SENDING, now, row[0]),
+            )
+        return row
+
+    def _finish(self, key, attempts, outcome):
+        if outcome in self.success:
+            with self._connect() as conn:
+                conn.execute("UPDATE outbox SET status = ? WHERE key = ?", (SENT, key))
+            return
+        attempts += 1
+        if attempts >= self.max_attempts:
+            logger.error("Giving up on outbox message %s after %d attempts", key, attempts)
+            status, delay = FAILED, 0
+        elif isinstance(outcome, RetryLater):
+            status, delay = PENDING, outcome.delay
+            logger.warning("Outbox message %s deferred; Slack asked to retry in %ds", key, delay)
+        else:
+            status, delay = PENDING, min(600, 30 * 2 ** (attempts - 1))
+            logger.warning("Outbox message %s not delivered; retrying in %ds", key, delay)
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = ?, next_attempt_at = ? WHERE key = ?",
+                (status, time.time() + delay, key),
+            )
+
+    def drain(self):
+        """Deliver every due message once. Returns {key: outcome}."""
+        outcomes = {}
+        while True:
+            claimed = self._claim()
+            if claimed is None:
+                return outcomes
+            key, text, webhook_url, attempts = claimed
+            try:
+                outcome = self.deliver(text, webhook_url)
+            except Exception:
+                logger.exception("Outbox delivery of %s raised", key)
+                outcome = None
+            self._finish(key, attempts, outcome)
+            outcomes[key] = outcome
+
+    def prune(self, older_than_days=30):
+        """Delete sent/failed messages older than the given age."""
+        cutoff = time.time() - older_than_days * 86400
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM outbox WHERE status IN (?, ?) AND created_at < ?",
+                (SENT, FAILED, cutoff),
+            )
+
+    def _run(self):
+        logger.info("Outbox worker started (%s)", self.path)
+        while not self._stop.is_set():
+            try:
+                self.drain()
+            except sqlite3.Error:
+                logger.exception("Outbox drain failed")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self):
+        """Start the background delivery thread (idempotent)."""
+        if self.running:
+            return
+        self._stop.clear()
+        self.prune()
+        self._thread = threading.Thread(target=self._run, name="slack-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
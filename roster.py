@@ -0,0 +1,89 @@
+"""Roster: people interned to small integer ids.
+
+Selection works on roster ids, sets of ids and bitsets (an int with bit i
+set for id i) instead of re-casefolding names on every call; display names
+only come back out for results and messages.
+"""
+
+
+class Roster:
+    """People interned to small integer ids (their position in the roster).
+
+    Each name is casefolded once, here. A name repeated with different case
+    is one person; the last spelling wins.
+    """
+
+    __slots__ = ("names", "keys", "ids", "_masks")
+
+    def __init__(self, people):
+        self.names = []
+        self.keys = []
+        self.ids = {}
+        self._masks = {}
+        for person in people:
+            key = person.casefold()
+            i = self.ids.get(key)
+            if i is None:
+                self.ids[key] = len(self.names)
+                self.names.append(person)
+                self.keys.append(key)
+            else:
+                self.names[i] = person
+
+    def __len__(self):
+        return len(self.names)
+
+    def ids_of(self, names):
+        """Return the set of ids for display names (names not on the roster are ignored)."""
+        ids = self.ids
+        return {ids[key] for key in map(str.casefold, names) if key in ids}
+
+    def ids_of_keys(self, keys):
+        """Same as ids_of, for names that are already casefolded."""
+        ids = self.ids
+        return {ids[key] for key in keys if key in ids}
+
+    def names_of(self, ids):
+        """Return display names for ids, in order."""
+        names = self.names
+        return [names[i] for i in ids]
+
+    # Bitsets: an int with bit i set for roster id i. Merging exclusions is
+    # an OR, membership a bit test; masks only make sense for their roster.
+
+    def mask_of_ids(self, ids):
+        """Return the bitset with the given ids set."""
+        buf = bytearray((len(self.names) + 7) // 8)
+        for i in ids:
+            buf[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(buf, "little")
+
+    def mask_of(self, names):
+        """Return the bitset of display names (names not on the roster are ignored).
+
+        Masks are memoized per distinct set of names: the day-of-week lists and
+        the overrides for a date repeat across ticks and rotations.
+        """
+        key = frozenset(names)
+        mask = self._masks.get(key)
+        if mask is None:
+            if len(self._masks) >= 256:
+                self._masks.clear()
+            mask = self._masks[key] = self.mask_of_ids(self.ids_of(key))
+        return mask
+
+    def exclusion_mask(self, excluded):
+        """Return the bitset for an exclusion bitset (unchanged) or a set of casefolded names."""
+        if isinstance(excluded, int):
+            return excluded
+        return self.mask_of_ids(self.ids_of_keys(excluded))
+
+    def weekly_counts(self, weekly):
+        """Return {id: Service Desk shifts this week} for people with at least one."""
+        ids = self.ids
+        counts = {}
+        for person, count in weekly.get("assignments", {}).items():
+            i = ids.get(person.casefold())
+            if i is not None and count:
+                counts[i] = counts.get(i, 0) + count
+        return counts
@@ -0,0 +1,194 @@
+"""Rotation registry: one process serving many independent duty rotations.
+
+Each rotation has its own people, operations, day rules, day-of-week
+exclusions, reduced-ops days, onboarding schedule, Slack webhook and history
+namespace. Rotations come from a JSON or TOML file (ROTATIONS_FILE, or the
+"rotations" list in CONFIG_FILE):
+
+    [
+      {
+        "name": "bayside",
+        "people": ["Alex", "Ed"],
+        "operations": ["<https://...|System Imaging>", "Audit Idle Hardware"],
+        "webhook_url": "https://hooks.slack.com/services/...",
+        "day_exclusions": {"Monday": ["Alex"]},
+        "reduced_ops_days": ["Monday"],
+        "onboarding_schedule": {"Monday": "FTE", "Tuesday": "Contractor"},
+        "day_ops_rules": {"monday": ["onboarding", "imaging"]}
+      }
+    ]
+
+Omitted fields fall back to the single-team defaults from bot.py / env vars.
+"""
+import json
+import re
+from collections.abc import Mapping
+from types import MappingProxyType
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: JSON config only
+    tomllib = None
+
+from roster import Roster
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+SLOT_TYPES = {"onboarding", "imaging", "anyday"}
+# Per-rotation settings that CONFIG_FILE may set for the default rotation
+ROTATION_FIELDS = {"people", "operations", "webhook_url", "day_exclusions", "reduced_ops_days",
+                   "onboarding_schedule", "day_ops_rules"}
+# Names double as history namespaces, which end up in file names
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class Rotation:
+    """Configuration for one rotation. Read-only once built (tuples and mapping proxies).
+
+    namespace selects the history store: "" is the original single-team
+    history file, anything else gets its own file (or SQLite namespace).
+    roster interns people to ids once for the selection code.
+    """
+
+    __slots__ = ("name", "people", "roster", "operations", "day_ops_rules", "day_exclusions",
+                 "reduced_ops_days", "onboarding_schedule", "webhook_url", "namespace")
+
+    def __init__(self, name, people, operations, day_ops_rules, day_exclusions=None,
+                 reduced_ops_days=(), onboarding_schedule=None, webhook_url="", namespace=None):
+        set_ = object.__setattr__
+        set_(self, "name", name)
+        set_(self, "people", tuple(people))
+        set_(self, "roster", Roster(self.people))
+        set_(self, "operations", tuple(operations))
+        set_(self, "day_ops_rules", MappingProxyType(
+            {d.casefold(): tuple(r) for d, r in day_ops_rules.items()}))
+        set_(self, "day_exclusions", MappingProxyType(
+            {d.casefold(): tuple(p) for d, p in (day_exclusions or {}).items()}))
+        set_(self, "reduced_ops_days", frozenset(d.casefold() for d in reduced_ops_days))
+        set_(self, "onboarding_schedule", MappingProxyType(
+            {d.casefold(): t for d, t in (onboarding_schedule or {}).items()}))
+        set_(self, "webhook_url", webhook_url)
+        set_(self, "namespace", name if namespace is None else namespace)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Rotation is read-only; reload the configuration instead")
+
+    def __reduce__(self):
+        # Mapping proxies don't pickle; rebuild from plain values (simulate.py workers)
+        return (Rotation, (self.name, self.people, self.operations, dict(self.day_ops_rules),
+                           dict(self.day_exclusions), tuple(self.reduced_ops_days),
+                           dict(self.onboarding_schedule), self.webhook_url, self.namespace))
+
+    def __repr__(self):
+        return f"Rotation({self.name!r}, {len(self.people)} people)"
+
+
+def _as_list(value, field, name):
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    if isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value):
+        return list(value)
+    raise ValueError(f"Rotation {name!r}: {field} must be a list of strings")
+
+
+def _check_days(mapping, field, name):
+    if not isinstance(mapping, Mapping):
+        raise ValueError(f"Rotation {name!r}: {field} must be an object keyed by weekday")
+    for day in mapping:
+        if day.casefold() not in WEEKDAYS:
+            raise ValueError(f"Rotation {name!r}: unknown day {day!r} in {field}")
+
+
+def parse_rotation(entry, defaults, namespace=None):
+    """Build a Rotation from one config entry, filling gaps from `defaults` (a Rotation).
+
+    namespace, if given, is used as the history namespace as-is (the default
+    rotation keeps "", which is not a valid namespace in the file).
+    """
+    if not isinstance(entry, dict):
+        raise ValueError("Each rotation must be a JSON object")
+    name = entry.get("name", "")
+    if not isinstance(name, str) or not NAME_PATTERN.match(name.strip()):
+        raise ValueError(f"Rotation name {name!r} must be non-empty letters, digits, '-' or '_'")
+    name = name.strip()
+    if namespace is None:
+        namespace = entry.get("namespace")
+        if namespace is not None and (not isinstance(namespace, str) or not NAME_PATTERN.match(namespace)):
+            raise ValueError(f"Rotation {name!r}: namespace must be letters, digits, '-' or '_'")
+
+    people = _as_list(entry.get("people", []), "people", name)
+    if not people:
+        raise ValueError(f"Rotation {name!r}: people is required")
+    operations = _as_list(entry.get("operations", defaults.operations), "operations", name)
+
+    day_exclusions = entry.get("day_exclusions", defaults.day_exclusions)
+    _check_days(day_exclusions, "day_exclusions", name)
+    day_exclusions = {d: _as_list(p, "day_exclusions", name) for d, p in day_exclusions.items()}
+
+    day_ops_rules = entry.get("day_ops_rules", defaults.day_ops_rules)
+    _check_days(day_ops_rules, "day_ops_rules", name)
+    for day, rules in day_ops_rules.items():
+        unknown = set(_as_list(rules, "day_ops_rules", name)) - SLOT_TYPES
+        if unknown:
+            raise ValueError(f"Rotation {name!r}: unknown slot types {sorted(unknown)} for {day}")
+
+    onboarding = entry.get("onboarding_schedule", defaults.onboarding_schedule)
+    _check_days(onboarding, "onboarding_schedule", name)
+
+    reduced = _as_list(entry.get("reduced_ops_days", sorted(defaults.reduced_ops_days)),
+                       "reduced_ops_days", name)
+    unknown_days = [d for d in reduced if d.casefold() not in WEEKDAYS]
+    if unknown_days:
+        raise ValueError(f"Rotation {name!r}: unknown days {unknown_days} in reduced_ops_days")
+
+    return Rotation(
+        name=name,
+        people=people,
+        operations=operations,
+        day_ops_rules=day_ops_rules,
+        day_exclusions=day_exclusions,
+        reduced_ops_days=reduced,
+        onboarding_schedule=onboarding,
+        webhook_url=entry.get("webhook_url", defaults.webhook_url),
+        namespace=namespace,
+    )
+
+
+def read_config_file(path):
+    """Read a JSON file, or TOML if the name ends in .toml. Raises ValueError."""
+    try:
+        raw = path.read_bytes()
+    except OSError as exc:
+        raise ValueError(f"{path}: cannot read config file ({exc})") from exc
+    if path.suffix.casefold() == ".toml":
+        if tomllib is None:
+            raise ValueError(f"{path}: TOML config needs Python 3.11+")
+        try:
+            return tomllib.loads(raw.decode())
+        except (tomllib.TOMLDecodeError, UnicodeDecodeError) as exc:
+            raise ValueError(f"{path}: invalid TOML ({exc})") from exc
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise ValueError(f"{path}: invalid JSON ({exc})") from exc
+
+
+def parse_rotations(data, defaults, source):
+    """Validate a list of rotation entries (or {"rotations": [...]}). Raises ValueError."""
+    if isinstance(data, dict):
+        data = data.get("rotations", [])
+    if not isinstance(data, list):
+        raise ValueError(f"{source}: expected a list of rotations")
+
+    rotations = [parse_rotation(entry, defaults) for entry in data]
+    names = [r.name for r in rotations]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{source}: duplicate rotation names")
+    namespaces = [r.namespace for r in rotations]
+    if len(set(namespaces)) != len(namespaces):
+        raise ValueError(f"{source}: duplicate history namespaces")
+    return rotations
+
+
+def load_rotations(path, defaults):
+    """Load and validate all rotations from a JSON (or TOML) file. Raises ValueError on bad config."""
+    return parse_rotations(read_config_file(path), defaults, path)
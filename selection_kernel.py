@@ -0,0 +1,85 @@
+"""Optional NumPy kernel for the Service Desk draw.
+
+People are integer ids (their position in the roster) and a draw works on
+arrays over the whole roster: day-excluded, history-excluded and weekly
+counts. The rules are the same as run_selection's:
+
+- history exclusions are dropped if fewer than 2 people would be left
+- if the people still needing their weekly shift fill the remaining slots,
+  the draw is from them first (uniform), topped up from everyone eligible
+- otherwise people needing their shift weigh `need_weight`, everyone else 1
+
+The weighted draw is Efraimidis-Spirakis, like bot.weighted_sample: every
+eligible id gets key u ** (1 / w) and the k largest keys win, in draw order.
+
+NumPy is optional; available() is False without it and bot.py keeps using
+the pure-Python path. It is imported on first use rather than with this
+module, so small rosters never pay its import time.
+"""
+np = None
+_numpy_missing = False
+
+
+def available():
+    """Return True if NumPy is installed (importing it on the first call)."""
+    global np, _numpy_missing
+    if np is None and not _numpy_missing:
+        try:
+            import numpy
+        except ImportError:  # optional dependency
+            _numpy_missing = True
+        else:
+            np = numpy
+    return np is not None
+
+
+def select_helpdesk(day_excluded, history_excluded, weekly_counts, remaining_days,
+                    need_weight=3.0, k=2, rng=None):
+    """Draw k Service Desk ids.
+
+    Args:
+        day_excluded: bool array (n,); True removes the person from the draw entirely
+        history_excluded: bool array (n,); soft exclusion (worked the last run)
+        weekly_counts: int array (n,) of Service Desk days so far this week
+        remaining_days: workdays left this week, today included
+        need_weight: weight for people who still need their weekly shift
+        k: people to draw
+        rng: numpy Generator (default: a fresh default_rng())
+
+    Returns: (ids, prioritized): int array (k,) of ids in draw order, -1 where
+    fewer than k could be drawn, and whether the weekly minimum forced the
+    draw from the people still needing their shift.
+    """
+    if not available():
+        raise RuntimeError("selection_kernel requires NumPy")
+    rng = rng if rng is not None else np.random.default_rng()
+
+    day_excluded = np.asarray(day_excluded, dtype=bool)
+    history_excluded = np.asarray(history_excluded, dtype=bool)
+    weekly_counts = np.asarray(weekly_counts)
+
+    available_mask = ~day_excluded
+    eligible = available_mask & ~history_excluded
+    if eligible.sum() < 2:
+        eligible = available_mask
+
+    needing = available_mask & (weekly_counts == 0)
+    needing_count = int(needing.sum())
+    priority = eligible & needing
+    must = 0 < needing_count and needing_count >= remaining_days * 2 and bool(priority.any())
+
+    u = rng.random(day_excluded.shape)
+    if must:
+        # Uniform within the priority pool, ranked above everyone else
+        keys = u + priority
+    else:
+        weights = np.where(needing, need_weight, 1.0)
+        with np.errstate(divide="ignore"):
+            keys = np.where(weights > 0, u ** (1.0 / np.where(weights > 0, weights, 1.0)), -1.0)
+    keys = np.where(eligible, keys, -1.0)
+
+    k = min(k, keys.size)
+    top = np.argpartition(-keys, k - 1)[:k] if k < keys.size else np.arange(k)
+    top = top[np.argsort(-keys[top], kind="stable")]
+    top[keys[top] < 0] = -1
+    return top, must
@@ -1,16 +1,20 @@
+import base64
+import fcntl
+import hashlib
 import json
 import logging
 import os
 import secrets
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
 from flask import Flask, request, jsonify, render_template, session, redirect, url_for
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
 
 import bot
+import state
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", secrets.token_hex(32))
@@ -20,6 +24,19 @@ LOCAL_TZ = ZoneInfo("America/Los_Angeles")
 UNAVAILABLE_FILE = Path(os.environ.get("UNAVAILABLE_FILE", "unavailable.json"))
 UNAVAILABLE_RANGES_FILE = Path(os.environ.get("UNAVAILABLE_RANGES_FILE", "unavailable_ranges.json"))
 PANEL_PASSWORD = os.environ.get("PANEL_PASSWORD", "")
+# Read APIs are revalidated on every poll (ETag / If-None-Match); shared caches
+# must not keep password-protected data
+CACHE_CONTROL = "private, no-cache" if PANEL_PASSWORD else "no-cache"
+# Largest page the unavailability GETs return with ?limit=
+MAX_PAGE_SIZE = 500
+# What a decoded page cursor must look like: a date for /api/unavailable,
+# a RangeIndex sort key (start, end, person, range id, tiebreak) for /api/unavailable-ranges
+DATE_CURSOR = str
+RANGE_CURSOR = (str, str, str, str, int)
+# Only the process holding this lock runs the scheduler and the outbox worker
+SCHEDULER_LOCK_FILE = Path(os.environ.get("SCHEDULER_LOCK_FILE", "scheduler.lock"))
+# How often the other processes check whether the scheduler leader went away
+LEADER_RETRY_SECONDS = 5
 
 
 @app.before_request
@@ -34,38 +51,320 @@ def require_auth():
 
 
 def load_unavailable():
-    """Load the unavailability data from disk."""
-    if not UNAVAILABLE_FILE.exists():
-        return {}
-    try:
-        return json.loads(UNAVAILABLE_FILE.read_text())
-    except (json.JSONDecodeError, OSError):
-        return {}
+    """Load the unavailability data from disk (cached; copy before mutating)."""
+    store = bot.get_store()
+    if store is not None:
+        return store.load_unavailable(datetime.now(LOCAL_TZ).strftime("%Y-%m-%d"))
+    data = state.load_json(UNAVAILABLE_FILE, {})
+    return data if isinstance(data, dict) else {}
 
 
-def save_unavailable(data):
-    """Save unavailability data, pruning past dates."""
+def prune_unavailable(data):
+    """Drop past dates and empty entries."""
     today = datetime.now(LOCAL_TZ).strftime("%Y-%m-%d")
-    pruned = {k: v for k, v in data.items() if k >= today and v}
-    UNAVAILABLE_FILE.write_text(json.dumps(pruned, indent=2))
+    return {k: v for k, v in data.items() if k >= today and v}
 
 
 def load_unavailable_ranges():
-    """Load range unavailability data from disk."""
-    if not UNAVAILABLE_RANGES_FILE.exists():
-        return []
-    try:
-        data = json.loads(UNAVAILABLE_RANGES_FILE.read_text())
-        return data if isinstance(data, list) else []
-    except (json.JSONDecodeError, OSError):
-        return []
+    """Load range unavailability data from disk (cached; copy before mutating)."""
+    store = bot.get_store()
+    if store is not None:
+        return store.load_ranges()
+    data = state.load_json(UNAVAILABLE_RANGES_FILE, [])
+    return data if isinstance(data, list) else []
 
 
-def save_unavailable_ranges(data):
-    """Save range unavailability data, pruning expired ranges."""
+def prune_unavailable_ranges(data):
+    """Drop ranges that ended before today."""
     today = datetime.now(LOCAL_TZ).strftime("%Y-%m-%d")
-    pruned = [r for r in data if r.get("end", "") >= today]
-    UNAVAILABLE_RANGES_FILE.write_text(json.dumps(pruned, indent=2))
+    return [r for r in data if r.get("end", "") >= today]
+
+
+def apply_unavailable(dates, ranges):
+    """Replace people on several dates ({date: people}; empty clears) and add ranges.
+
+    A range with the same person, start and end as a stored one is not added
+    again, so a retried batch doesn't duplicate ranges. One locked write per
+    file (one transaction with SQLite), however many items.
+
+    Returns: the stored entry for each of `ranges` (the existing one for duplicates)
+    """
+    store = bot.get_store()
+    if store is not None:
+        return store.apply_unavailable(dates, ranges, datetime.now(LOCAL_TZ).strftime("%Y-%m-%d"))
+
+    def apply_dates(data):
+        data = dict(data) if isinstance(data, dict) else {}
+        for date_str, people in dates.items():
+            if people:
+                data[date_str] = people
+            else:
+                data.pop(date_str, None)
+        return prune_unavailable(data)
+
+    stored = []
+
+    def apply_ranges(existing):
+        existing = prune_unavailable_ranges(existing if isinstance(existing, list) else [])
+        by_span = {(r.get("person"), r.get("start"), r.get("end")): r for r in existing}
+        stored.clear()
+        for entry in ranges:
+            span = (entry["person"], entry["start"], entry["end"])
+            if span not in by_span:
+                by_span[span] = entry
+                existing.append(entry)
+            stored.append(by_span[span])
+        return existing
+
+    if dates:
+        state.update_json(UNAVAILABLE_FILE, {}, apply_dates, indent=2)
+    if ranges:
+        state.update_json(UNAVAILABLE_RANGES_FILE, [], apply_ranges, indent=2)
+    return stored
+
+
+def update_unavailable(date_str, people):
+    """Set the people unavailable on one date; an empty list clears the date."""
+    apply_unavailable({date_str: people}, [])
+
+
+def add_range(entry):
+    """Add one range entry. Returns the stored entry (an existing one if it's a duplicate)."""
+    return apply_unavailable({}, [entry])[0]
+
+
+def _index_range_ids(ranges):
+    if not isinstance(ranges, list):
+        return {}
+    return {r["id"]: (pos, r) for pos, r in enumerate(ranges) if isinstance(r, dict) and r.get("id")}
+
+
+def range_ids():
+    """{range id: (list position, entry)} for unavailable_ranges.json, cached until it changes."""
+    return state.load_json(UNAVAILABLE_RANGES_FILE, {}, build=_index_range_ids)
+
+
+def find_range(range_id):
+    """Return the range with this id, or None."""
+    store = bot.get_store()
+    if store is not None:
+        return store.get_range(range_id)
+    hit = range_ids().get(range_id)
+    return None if hit is None else hit[1]
+
+
+def read_ranges_for_update():
+    """Read unavailable_ranges.json from disk; call under state.locked, not through the cache."""
+    ranges = state.read_json(UNAVAILABLE_RANGES_FILE, [])
+    return ranges if isinstance(ranges, list) else []
+
+
+def _range_position(ranges, range_id):
+    return next((pos for pos, r in enumerate(ranges) if isinstance(r, dict) and r.get("id") == range_id), None)
+
+
+def delete_range(range_id):
+    """Delete the range with this id. Returns False if there is none."""
+    store = bot.get_store()
+    if store is not None:
+        return store.delete_range(range_id)
+    with state.locked(UNAVAILABLE_RANGES_FILE):
+        ranges = read_ranges_for_update()
+        pos = _range_position(ranges, range_id)
+        if pos is None:
+            return False
+        del ranges[pos]
+        state.write_json(UNAVAILABLE_RANGES_FILE, prune_unavailable_ranges(ranges), indent=2)
+    return True
+
+
+def update_range(range_id, entry):
+    """Replace the range with this id by entry. Returns False if there is none."""
+    store = bot.get_store()
+    if store is not None:
+        return store.update_range(range_id, entry)
+    with state.locked(UNAVAILABLE_RANGES_FILE):
+        ranges = read_ranges_for_update()
+        pos = _range_position(ranges, range_id)
+        if pos is None:
+            return False
+        ranges[pos] = {**entry, "id": range_id}
+        state.write_json(UNAVAILABLE_RANGES_FILE, prune_unavailable_ranges(ranges), indent=2)
+    return True
+
+
+def ensure_range_ids():
+    """Give ranges saved before ids existed a stable id (JSON backend; SQLite migrates itself)."""
+    if bot.get_store() is not None:
+        return
+
+    def missing(r):
+        return isinstance(r, dict) and not r.get("id")
+
+    if not any(missing(r) for r in load_unavailable_ranges()):
+        return
+
+    def apply(ranges):
+        ranges = ranges if isinstance(ranges, list) else []
+        return [{"id": bot.new_range_id(), **r} if missing(r) else r for r in ranges]
+
+    try:
+        ranges = state.update_json(UNAVAILABLE_RANGES_FILE, [], apply, indent=2)
+    except OSError:
+        # Ranges without an id can still be deleted by position; retried on the next start
+        logger.warning("Could not assign ids to legacy ranges (read-only filesystem?)")
+        return
+    logger.info("Assigned ids to legacy ranges in %s (%d ranges)", UNAVAILABLE_RANGES_FILE, len(ranges))
+
+
+def delete_range_at(idx):
+    """Delete the range at list position idx. Returns False if there is none."""
+    store = bot.get_store()
+    if store is not None:
+        return store.delete_range_at(idx)
+    with state.locked(UNAVAILABLE_RANGES_FILE):
+        ranges = read_ranges_for_update()
+        if not 0 <= idx < len(ranges):
+            return False
+        ranges.pop(idx)
+        state.write_json(UNAVAILABLE_RANGES_FILE, prune_unavailable_ranges(ranges), indent=2)
+    return True
+
+
+def parse_unavailable_change(body):
+    """Validate a {"date", "people"} change. Returns (date_str, people); raises ValueError."""
+    if not isinstance(body, dict):
+        raise ValueError("Expected a JSON object")
+    date_str = body.get("date")
+    people = body.get("people", [])
+
+    if not date_str:
+        raise ValueError("date is required")
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise ValueError("Invalid date format, use YYYY-MM-DD") from None
+    if not isinstance(people, list) or not all(isinstance(p, str) for p in people):
+        raise ValueError("people must be a list of names")
+    return date_str, people
+
+
+def parse_range(body, valid_people, today):
+    """Validate a {"person", "start", "end"} range. Returns the entry; raises ValueError."""
+    if not isinstance(body, dict):
+        raise ValueError("Expected a JSON object")
+    values = {}
+    for field in ("person", "start", "end"):
+        value = body.get(field, "")
+        values[field] = value.strip() if isinstance(value, str) else ""
+    person, start, end = values["person"], values["start"], values["end"]
+
+    if person not in valid_people:
+        raise ValueError(f"Unknown person: {person}")
+    for label, val in [("start", start), ("end", end)]:
+        if not val:
+            raise ValueError(f"{label} is required")
+        try:
+            values[label] = datetime.strptime(val, "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            raise ValueError(f"Invalid {label} format, use YYYY-MM-DD") from None
+    start, end = values["start"], values["end"]
+    if start > end:
+        raise ValueError("start must be on or before end")
+    if end < today:
+        raise ValueError("Range is entirely in the past")
+    return {"person": person, "start": start, "end": end}
+
+
+def encode_cursor(value):
+    """Opaque, URL-safe page cursor."""
+    return base64.urlsafe_b64encode(json.dumps(value, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, shape):
+    """Decode a page cursor and check it against shape (a type, or a tuple of types for a list)."""
+    try:
+        value = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor") from None
+    items, types = ([value], (shape,)) if isinstance(shape, type) else (value, shape)
+    if not (isinstance(items, list) and len(items) == len(types)
+            and all(type(item) is kind for item, kind in zip(items, types))):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def parse_window_args(args, cursor_shape):
+    """Read the from/to/person/cursor/limit query args into index query kwargs.
+
+    Returns None when none of them is set; raises ValueError for bad values.
+    """
+    if not any(args.get(name, "").strip() for name in ("from", "to", "person", "cursor", "limit")):
+        return None
+    window = {"start": None, "end": None, "person": None, "after": None, "limit": None}
+    for name, key in (("from", "start"), ("to", "end")):
+        value = args.get(name, "").strip()
+        if value:
+            try:
+                # Normalized: the indexes compare zero-padded date strings
+                window[key] = datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+            except ValueError:
+                raise ValueError(f"Invalid {name} format, use YYYY-MM-DD") from None
+    window["person"] = args.get("person", "").strip() or None
+    limit = args.get("limit", "").strip()
+    if limit:
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        window["limit"] = int(limit)
+    cursor = args.get("cursor", "").strip()
+    if cursor:
+        window["after"] = decode_cursor(cursor, cursor_shape)
+    return window
+
+
+def paged(items, next_cursor):
+    """(body, headers) for conditional_json; the next page's cursor goes in X-Next-Cursor."""
+    return items, {} if next_cursor is None else {"X-Next-Cursor": encode_cursor(next_cursor)}
+
+
+def unavailable_version():
+    """Version of the date-based unavailability data (file stat or SQLite generation)."""
+    store = bot.get_store()
+    if store is not None:
+        # store.load_unavailable drops past dates, so the day is part of the version
+        return ("sqlite", store.version("unavailable"), datetime.now(LOCAL_TZ).strftime("%Y-%m-%d"))
+    return state.file_version(UNAVAILABLE_FILE)
+
+
+def ranges_version():
+    """Version of the range unavailability data (file stat or SQLite generation)."""
+    store = bot.get_store()
+    if store is not None:
+        return ("sqlite", store.version("ranges"))
+    return state.file_version(UNAVAILABLE_RANGES_FILE)
+
+
+def conditional_json(version, load):
+    """Return jsonify(load()) with a strong ETag derived from version.
+
+    load() returns the body, or (body, extra headers). Answers 304 without
+    calling load() when If-None-Match already has the tag. Take the version
+    before loading: a write in between then costs the client one extra
+    transfer instead of a 304 for data it never got.
+    """
+    etag = hashlib.sha1(repr(version).encode()).hexdigest()[:20]
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        body = load()
+        headers = {}
+        if isinstance(body, tuple):
+            body, headers = body
+        response = jsonify(body)
+        response.headers.update(headers)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
 
 
 # ---- Routes ----
@@ -88,94 +387,208 @@ def index():
 
 @app.route("/api/people", methods=["GET"])
 def get_people():
-    people = bot.get_config_list("PEOPLE", bot.PEOPLE)
-    return jsonify(people)
+    people = bot.get_config().people
+    return conditional_json(("people",) + people, lambda: list(people))
 
 
 @app.route("/api/unavailable", methods=["GET"])
 def get_unavailable():
-    return jsonify(load_unavailable())
+    try:
+        window = parse_window_args(request.args, DATE_CURSOR)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if window is None:
+        return conditional_json(unavailable_version(), load_unavailable)
 
+    # Filtered / paginated: answered from the sorted date index
+    def page():
+        return paged(*bot.get_unavailable_index().query(**window))
 
-@app.route("/api/unavailable", methods=["POST"])
-def set_unavailable():
-    body = request.get_json()
-    date_str = body.get("date")
-    people = body.get("people", [])
+    try:
+        return conditional_json(unavailable_version(), page)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
-    if not date_str:
-        return jsonify({"error": "date is required"}), 400
 
+@app.route("/api/unavailable", methods=["POST"])
+def set_unavailable():
     try:
-        datetime.strptime(date_str, "%Y-%m-%d")
-    except ValueError:
-        return jsonify({"error": "Invalid date format, use YYYY-MM-DD"}), 400
-
-    data = load_unavailable()
-    if people:
-        data[date_str] = people
-    else:
-        data.pop(date_str, None)
+        date_str, people = parse_unavailable_change(request.get_json(silent=True))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
-    save_unavailable(data)
+    update_unavailable(date_str, people)
     return jsonify({"ok": True, "date": date_str, "people": people})
 
 
+@app.route("/api/unavailable/bulk", methods=["POST"])
+def bulk_unavailable():
+    """Apply many date changes and ranges at once.
+
+    Body: {"dates": [{"date", "people"}, ...], "ranges": [{"person", "start", "end"}, ...]}.
+    Every item is validated first; if any fails nothing is written and the
+    response (400) marks which ones. Otherwise all of them are applied with one
+    write per file. Date items replace that date's people like POST
+    /api/unavailable (a later item for the same date wins). A range that is
+    already stored (same person, start and end) is reported with its existing
+    id rather than added again, so retrying a batch is safe.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    date_items = body.get("dates", [])
+    range_items = body.get("ranges", [])
+    if not isinstance(date_items, list) or not isinstance(range_items, list):
+        return jsonify({"error": "dates and ranges must be lists"}), 400
+
+    dates, ranges = {}, []
+    date_results, range_results = [], []
+    for item in date_items:
+        try:
+            date_str, people = parse_unavailable_change(item)
+        except ValueError as exc:
+            date_results.append({"ok": False, "error": str(exc)})
+            continue
+        dates[date_str] = people
+        date_results.append({"ok": True, "date": date_str, "people": people})
+
+    valid_people = set(bot.get_all_people())
+    today = datetime.now(LOCAL_TZ).strftime("%Y-%m-%d")
+    for item in range_items:
+        try:
+            entry = {"id": bot.new_range_id(), **parse_range(item, valid_people, today)}
+        except ValueError as exc:
+            range_results.append({"ok": False, "error": str(exc)})
+            continue
+        ranges.append(entry)
+        range_results.append({"ok": True, "range": entry})
+
+    ok = all(r["ok"] for r in date_results + range_results)
+    if ok:
+        stored = iter(apply_unavailable(dates, ranges))
+        for result in range_results:
+            result["range"] = next(stored)
+    result = {"ok": ok, "dates": date_results, "ranges": range_results}
+    return jsonify(result), 200 if ok else 400
+
+
 @app.route("/api/unavailable/<date_str>", methods=["DELETE"])
 def delete_unavailable(date_str):
-    data = load_unavailable()
-    data.pop(date_str, None)
-    save_unavailable(data)
+    update_unavailable(date_str, [])
     return jsonify({"ok": True})
 
 
 @app.route("/api/unavailable-ranges", methods=["GET"])
 def get_unavailable_ranges():
-    return jsonify(load_unavailable_ranges())
+    date_str = request.args.get("date", "").strip()
+    try:
+        if date_str:
+            date_str = datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return jsonify({"error": "Invalid date format, use YYYY-MM-DD"}), 400
+    try:
+        window = parse_window_args(request.args, RANGE_CURSOR)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if window is not None:
+        # Filtered / paginated, in start-date order; ?date=D is short for from=D&to=D
+        window["start"] = window["start"] or date_str or None
+        window["end"] = window["end"] or date_str or None
+
+        def page():
+            pairs, next_cursor = bot.get_range_index().query(**window)
+            return paged([entry for _, entry in pairs], next_cursor)
+
+        try:
+            return conditional_json(ranges_version(), page)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+    if not date_str:
+        return conditional_json(ranges_version(), load_unavailable_ranges)
+
+    # Only ranges covering the given date, answered from the interval index
+    def covering():
+        index = bot.get_range_index()
+        return [entry for _, entry in index.entries_between(date_str, date_str)]
+
+    return conditional_json((ranges_version(), date_str), covering)
 
 
 @app.route("/api/unavailable-ranges", methods=["POST"])
 def add_unavailable_range():
-    body = request.get_json()
-    person = body.get("person", "").strip()
-    start = body.get("start", "").strip()
-    end = body.get("end", "").strip()
+    today = datetime.now(LOCAL_TZ).strftime("%Y-%m-%d")
+    try:
+        entry = parse_range(request.get_json(silent=True), bot.get_all_people(), today)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
-    valid_people = bot.get_config_list("PEOPLE", bot.PEOPLE)
-    if person not in valid_people:
-        return jsonify({"error": f"Unknown person: {person}"}), 400
+    entry = add_range({"id": bot.new_range_id(), **entry})
+    return jsonify({"ok": True, "range": entry})
 
-    for label, val in [("start", start), ("end", end)]:
-        if not val:
-            return jsonify({"error": f"{label} is required"}), 400
-        try:
-            datetime.strptime(val, "%Y-%m-%d")
-        except ValueError:
-            return jsonify({"error": f"Invalid {label} format, use YYYY-MM-DD"}), 400
 
-    if start > end:
-        return jsonify({"error": "start must be on or before end"}), 400
+@app.route("/api/unavailable-ranges/<range_id>", methods=["PATCH"])
+def patch_unavailable_range(range_id):
+    """Edit person/start/end of one range in place; omitted fields keep their value."""
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    current = find_range(range_id)
+    if current is None:
+        return jsonify({"error": "Unknown range"}), 404
 
+    merged = {**current, **{k: body[k] for k in ("person", "start", "end") if k in body}}
     today = datetime.now(LOCAL_TZ).strftime("%Y-%m-%d")
-    if end < today:
-        return jsonify({"error": "Range is entirely in the past"}), 400
+    try:
+        entry = {"id": range_id, **parse_range(merged, bot.get_all_people(), today)}
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if not update_range(range_id, entry):
+        return jsonify({"error": "Unknown range"}), 404
+    return jsonify({"ok": True, "range": entry})
 
-    ranges = load_unavailable_ranges()
-    ranges.append({"person": person, "start": start, "end": end})
-    save_unavailable_ranges(ranges)
-    return jsonify({"ok": True, "range": {"person": person, "start": start, "end": end}})
+
+@app.route("/api/unavailable-ranges/<range_id>", methods=["DELETE"])
+def delete_unavailable_range_by_id(range_id):
+    if delete_range(range_id):
+        return jsonify({"ok": True})
+    return jsonify({"error": "Unknown range"}), 404
 
 
+# Legacy: delete by list position (all-digit paths; range ids always start with "r")
 @app.route("/api/unavailable-ranges/<int:idx>", methods=["DELETE"])
 def delete_unavailable_range(idx):
-    ranges = load_unavailable_ranges()
-    if 0 <= idx < len(ranges):
-        ranges.pop(idx)
-        save_unavailable_ranges(ranges)
+    if delete_range_at(idx):
         return jsonify({"ok": True})
     return jsonify({"error": "Index out of range"}), 404
 
 
+@app.route("/api/last-run", methods=["GET"])
+def get_last_run():
+    """Per-rotation status and wall time of the most recent bot run (written by the scheduler leader)."""
+    return jsonify(bot.load_last_run())
+
+
+@app.route("/api/admin/reload-config", methods=["POST"])
+def reload_config():
+    """Re-read CONFIG_FILE / ROTATIONS_FILE now instead of waiting for the poller.
+
+    This process reloads at once. The files are touched so the other workers'
+    watchers follow, and the scheduler leader re-checks them before every run.
+    """
+    bot.touch_config_files()
+    try:
+        config = bot.reload_config()
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({
+        "ok": True,
+        "rotations": [r.name for r in config.rotations],
+        "people": list(config.people),
+    })
+
+
 @app.route("/health")
 def health():
     return "ok"
@@ -186,13 +599,20 @@ def health():
 def run_bot_job():
     """Wrapper to call the bot's main() from APScheduler."""
     logger.info("APScheduler triggering bot main()")
+    # Pick up config changes even if this process's watcher is off or hasn't polled yet
+    bot.refresh_config()
     try:
         bot.main()
     except Exception:
         logger.exception("Bot run failed")
+    logger.debug("State cache stats: %s", state.cache_stats())
 
 
 def start_scheduler():
+    # APScheduler is only imported by a process that actually schedules
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
     scheduler = BackgroundScheduler(timezone="UTC")
     # Replicate the Railway cron: 0,30 0,1,16,17 * * 1-6 UTC
     # The bot's should_run_now() and should_run_preview() guards filter to correct Pacific times
@@ -213,6 +633,71 @@ def start_scheduler():
     return scheduler
 
 
+_leader_lock = None
+_scheduler = None
+_outbox = None
+
+
+def try_become_leader():
+    """Take the scheduler lock without blocking. Returns True if this process holds it.
+
+    The lock is held until the process exits, so when the leader dies (or a
+    gunicorn worker is recycled) another process picks it up.
+    """
+    global _leader_lock
+    if _leader_lock is not None:
+        return True
+    try:
+        lock_file = open(SCHEDULER_LOCK_FILE, "a")
+    except OSError:
+        logger.warning("Could not open scheduler lock %s (read-only filesystem?)", SCHEDULER_LOCK_FILE)
+        return False
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _leader_lock = lock_file
+    return True
+
+
+def _start_leader_jobs():
+    global _scheduler, _outbox
+    logger.info("Process %d is the scheduler leader", os.getpid())
+    _outbox = bot.get_outbox()
+    if _outbox is not None:
+        _outbox.start()
+    _scheduler = start_scheduler()
+
+
+def _wait_for_leadership():
+    while not try_become_leader():
+        time.sleep(LEADER_RETRY_SECONDS)
+    _start_leader_jobs()
+
+
+def start_background_jobs():
+    """Start per-process background work; call once in every server process.
+
+    Every process watches the config file. The scheduler and the outbox worker
+    run in exactly one of them (elected via SCHEDULER_LOCK_FILE), so N gunicorn
+    workers don't fire the bot N times.
+    """
+    bot.watch_config()
+    if try_become_leader():
+        _start_leader_jobs()
+    else:
+        threading.Thread(target=_wait_for_leadership, name="scheduler-election", daemon=True).start()
+
+
+def stop_background_jobs():
+    """Let a running bot job and pending Slack deliveries finish before the process exits."""
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=True)
+    if _outbox is not None:
+        _outbox.stop()
+
+
 # ---- Startup ----
 
 logging.basicConfig(
@@ -220,8 +705,16 @@ logging.basicConfig(
     format="%(asctime)s %(levelname)s %(message)s",
 )
 
-scheduler = start_scheduler()
+# Parse and validate the configuration now: a bad PEOPLE / ONBOARDING_SCHEDULE /
+# config file stops the server here instead of failing a scheduled run later.
+# Later edits to CONFIG_FILE / ROTATIONS_FILE are picked up by the watcher.
+bot.get_config()
+ensure_range_ids()
 
+# Importing this module starts no threads: gunicorn.conf.py calls
+# start_background_jobs() in each worker, the development server below does it
+# itself.
 if __name__ == "__main__":
+    start_background_jobs()
     port = int(os.environ.get("PORT", 8080))
     app.run(host="0.0.0.0", port=port, debug=False)
@@ -0,0 +1,221 @@
+"""Monte Carlo fairness simulator for the rotation algorithm.
+
+Runs the real run_selection / select_onboarding over many simulated weeks
+entirely in memory (no history files, no unavailability files, no Slack),
+spread across worker processes, and reports per-person Service Desk and
+onboarding distribution, the longest Service Desk streaks and how often the
+weekly minimum was missed.
+
+    python simulate.py --years 10 --trials 1000
+    python simulate.py --rotation bayside --absence-rate 0.1 --json results.json
+
+Absences are simulated per person: a daily chance of being out (sick days,
+appointments) plus a weekly chance of starting a multi-day leave. Recurring
+day-of-week exclusions from the rotation config apply as usual.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+
+import bot
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday")
+
+
+def simulate_trial(rotation, weeks, seed, absence_rate, leave_rate, leave_days):
+    """Simulate one trial of `weeks` weeks. Returns per-person counters."""
+    rng = random.Random(seed)
+    random.seed(seed)  # run_selection draws from the module-level generator
+
+    roster = rotation.roster
+    people = roster.names
+    bits = [(person, 1 << i) for i, person in enumerate(people)]
+    operations = rotation.operations
+    day_rules = rotation.day_ops_rules
+    catalog = bot.get_task_catalog(operations)
+    key_of = catalog.key_of
+    days = [
+        (
+            day_index,
+            day_name,
+            roster.mask_of(rotation.day_exclusions.get(day_name, [])),
+            day_name in rotation.reduced_ops_days,
+            day_name in rotation.onboarding_schedule,
+        )
+        for day_index, day_name in enumerate(WEEKDAYS)
+    ]
+
+    sd = dict.fromkeys(people, 0)
+    onboarding = dict.fromkeys(people, 0)
+    streak = dict.fromkeys(people, 0)
+    max_streak = dict.fromkeys(people, 0)
+    violations = dict.fromkeys(people, 0)
+    days_available = dict.fromkeys(people, 0)
+    empty_days = 0
+
+    history, last_ops, last_onboarding = [], {}, []
+    leave_left = dict.fromkeys(people, 0)
+    random_ = rng.random
+
+    for week in range(weeks):
+        counts = {}
+        weekly = {"week": week, "assignments": counts}
+        available_this_week = set()
+        for person in people:
+            if not leave_left[person] and random_() < leave_rate:
+                leave_left[person] = leave_days
+
+        for day_index, day_name, static_excluded, reduced_ops, has_onboarding in days:
+            excluded = static_excluded
+            for person, bit in bits:
+                if leave_left[person]:
+                    leave_left[person] -= 1
+                    excluded |= bit
+                elif random_() < absence_rate:
+                    excluded |= bit
+
+            selected, assignments = bot.run_selection(
+                roster, operations, bot.get_excluded_people(history), excluded,
+                reduced_ops, last_ops, weekly, 5 - day_index, day_name, day_rules,
+            )
+            onboarding_people = []
+            if has_onboarding:
+                onboarding_people = bot.select_onboarding(roster, excluded, last_onboarding)
+
+            # Same state transitions as save_history
+            history = (history + [selected])[-2:]
+            if assignments:
+                last_ops = {p: [key_of(t) for t in tasks] for p, tasks in assignments.items()}
+            if onboarding_people:
+                last_onboarding = onboarding_people
+                for person in onboarding_people:
+                    onboarding[person] += 1
+
+            if not selected:
+                empty_days += 1
+            for person in selected:
+                sd[person] += 1
+                counts[person] = counts.get(person, 0) + 1
+            for person, bit in bits:
+                if not excluded & bit:
+                    days_available[person] += 1
+                    available_this_week.add(person)
+                if person in selected:
+                    streak[person] += 1
+                    if streak[person] > max_streak[person]:
+                        max_streak[person] = streak[person]
+                else:
+                    streak[person] = 0
+
+        for person in available_this_week:
+            if not counts.get(person):
+                violations[person] += 1
+
+    return {
+        "sd": sd,
+        "onboarding": onboarding,
+        "max_streak": max_streak,
+        "violations": violations,
+        "days_available": days_available,
+        "empty_days": empty_days,
+    }
+
+
+def _run_trial(args):
+    return simulate_trial(*args)
+
+
+def _init_worker():
+    logging.disable(logging.CRITICAL)
+
+
+def summarize(results, people, weeks):
+    """Aggregate per-trial counters into per-person statistics."""
+    trials = len(results)
+    days = weeks * 5
+    summary = {"trials": trials, "weeks": weeks, "people": {}}
+    for person in people:
+        sd = [r["sd"][person] for r in results]
+        available = [r["days_available"][person] for r in results]
+        streaks = [r["max_streak"][person] for r in results]
+        violations = [r["violations"][person] for r in results]
+        onboarding = [r["onboarding"][person] for r in results]
+        summary["people"][person] = {
+            "sd_per_week": statistics.fmean(sd) / weeks,
+            "sd_per_week_stdev": statistics.pstdev(sd) / weeks,
+            "sd_per_available_day": sum(sd) / max(1, sum(available)),
+            "available_share": statistics.fmean(available) / days,
+            "onboarding_per_week": statistics.fmean(onboarding) / weeks,
+            "max_streak": max(streaks),
+            "mean_max_streak": statistics.fmean(streaks),
+            "weekly_minimum_misses_per_year": statistics.fmean(violations) / weeks * 52,
+        }
+    summary["empty_service_desk_days"] = sum(r["empty_days"] for r in results)
+    return summary
+
+
+def print_summary(summary, elapsed):
+    print(f"{summary['trials']:,} trials x {summary['weeks']:,} weeks in {elapsed:.1f}s")
+    print(f"{'Person':16} {'SD/wk':>7} {'±':>6} {'SD/avail':>9} {'avail':>6} "
+          f"{'Onb/wk':>7} {'streak':>7} {'avg':>5} {'misses/yr':>10}")
+    for person, s in summary["people"].items():
+        print(f"{person[:16]:16} {s['sd_per_week']:7.3f} {s['sd_per_week_stdev']:6.3f} "
+              f"{s['sd_per_available_day']:9.3f} {s['available_share']:6.1%} "
+              f"{s['onboarding_per_week']:7.3f} {s['max_streak']:7d} {s['mean_max_streak']:5.2f} "
+              f"{s['weekly_minimum_misses_per_year']:10.3f}")
+    if summary["empty_service_desk_days"]:
+        print(f"Days with nobody on Service Desk: {summary['empty_service_desk_days']:,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=float, default=10)
+    parser.add_argument("--trials", type=int, default=1000)
+    parser.add_argument("--rotation", help="rotation name from ROTATIONS_FILE (default: the first one)")
+    parser.add_argument("--absence-rate", type=float, default=0.03, help="daily chance a person is out")
+    parser.add_argument("--leave-rate", type=float, default=0.01, help="weekly chance a person starts a leave")
+    parser.add_argument("--leave-days", type=int, default=5, help="workdays per leave")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the summary as JSON to this file")
+    args = parser.parse_args(argv)
+
+    rotations = bot.get_rotations()
+    if args.rotation:
+        matches = [r for r in rotations if r.name == args.rotation]
+        if not matches:
+            parser.error(f"unknown rotation {args.rotation!r}")
+        rotation = matches[0]
+    else:
+        rotation = rotations[0]
+
+    weeks = round(args.years * 52)
+    jobs = [
+        (rotation, weeks, args.seed * 1_000_003 + trial, args.absence_rate, args.leave_rate, args.leave_days)
+        for trial in range(args.trials)
+    ]
+    started = time.perf_counter()
+    if args.processes > 1:
+        chunksize = max(1, len(jobs) // (args.processes * 8))
+        with multiprocessing.Pool(args.processes, initializer=_init_worker) as pool:
+            results = pool.map(_run_trial, jobs, chunksize=chunksize)
+    else:
+        _init_worker()
+        results = [_run_trial(job) for job in jobs]
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(results, rotation.roster.names, weeks)
+    print_summary(summary, elapsed)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,423 @@
+"""SQLite storage backend (STORAGE_BACKEND=sqlite).
+
+Replaces the three whole-file JSON blobs with indexed tables so each change is
+a handful of row upserts instead of a full rewrite. Run this module directly to
+import the existing JSON files:
+
+    STORAGE_BACKEND=sqlite python sqlite_store.py import
+"""
+import json
+import logging
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+
+# History tables are keyed by rotation namespace ("" is the single-team history)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS selections (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    people TEXT NOT NULL,
+    namespace TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS selections_namespace ON selections (namespace, seq);
+CREATE TABLE IF NOT EXISTS last_ops (
+    namespace TEXT NOT NULL DEFAULT '',
+    person TEXT NOT NULL,
+    tasks TEXT NOT NULL,
+    PRIMARY KEY (namespace, person)
+);
+CREATE TABLE IF NOT EXISTS weekly_counts (
+    namespace TEXT NOT NULL DEFAULT '',
+    week TEXT NOT NULL,
+    person TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (namespace, week, person)
+);
+CREATE TABLE IF NOT EXISTS previews (
+    namespace TEXT PRIMARY KEY DEFAULT '',
+    target_date TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS date_overrides (
+    date TEXT NOT NULL,
+    person TEXT NOT NULL,
+    PRIMARY KEY (date, person)
+);
+CREATE TABLE IF NOT EXISTS ranges (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    person TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    uid TEXT
+);
+CREATE INDEX IF NOT EXISTS ranges_start ON ranges (start);
+CREATE INDEX IF NOT EXISTS ranges_end ON ranges (end);
+CREATE UNIQUE INDEX IF NOT EXISTS ranges_uid ON ranges (uid);
+"""
+
+# New range ids when the caller doesn't supply one: "r" + 16 hex digits, like bot.new_range_id()
+NEW_RANGE_ID = "'r' || lower(hex(randomblob(8)))"
+
+# Version 2 ranges had no stable id
+MIGRATE_V2 = f"""
+ALTER TABLE ranges ADD COLUMN uid TEXT;
+UPDATE ranges SET uid = {NEW_RANGE_ID} WHERE uid IS NULL;
+"""
+
+# Version 1 history tables had no namespace column
+MIGRATE_V1 = """
+ALTER TABLE selections ADD COLUMN namespace TEXT NOT NULL DEFAULT '';
+ALTER TABLE last_ops RENAME TO last_ops_v1;
+ALTER TABLE weekly_counts RENAME TO weekly_counts_v1;
+ALTER TABLE previews RENAME TO previews_v1;
+"""
+MIGRATE_V1_COPY = """
+INSERT INTO last_ops (namespace, person, tasks) SELECT '', person, tasks FROM last_ops_v1;
+INSERT INTO weekly_counts (namespace, week, person, count) SELECT '', week, person, count FROM weekly_counts_v1;
+INSERT OR REPLACE INTO previews (namespace, target_date, data) SELECT '', target_date, data FROM previews_v1;
+DROP TABLE last_ops_v1;
+DROP TABLE weekly_counts_v1;
+DROP TABLE previews_v1;
+"""
+
+
+def _ns_key(key, namespace):
+    return f"{key}:{namespace}" if namespace else key
+
+
+class SqliteStore:
+    """Row-level storage for history, date overrides and ranges."""
+
+    def __init__(self, path):
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            if not self._initialized:
+                with self._init_lock:
+                    if not self._initialized:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        self._migrate(conn)
+                        self._initialized = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _migrate(self, conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        has_tables = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'selections'"
+        ).fetchone()
+        if has_tables and version < 3:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(ranges)")}
+            if columns and "uid" not in columns:
+                logger.info("Adding range ids to %s", self.path)
+                conn.executescript(MIGRATE_V2)
+        if has_tables and version < 2:
+            logger.info("Migrating %s to schema version %d", self.path, SCHEMA_VERSION)
+            conn.executescript(MIGRATE_V1)
+            conn.executescript(SCHEMA)
+            conn.executescript(MIGRATE_V1_COPY)
+        else:
+            conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _get_meta(self, conn, key, default=None):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, conn, key, value):
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value)),
+        )
+
+    def _bump(self, conn, key):
+        """Advance the generation counter that version(key) reads."""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+            (f"{key}_version",),
+        )
+
+    def version(self, key):
+        """Return the write generation counter for a table group (e.g. "ranges")."""
+        with self._connect() as conn:
+            return self._get_meta(conn, f"{key}_version", 0)
+
+    # ---- History ----
+
+    def load_history(self, current_week, namespace=""):
+        """Return (selections, last_ops, weekly, preview, last_onboarding) like bot.load_history."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT people FROM selections WHERE namespace = ? ORDER BY seq DESC LIMIT 2",
+                (namespace,),
+            ).fetchall()
+            selections = [json.loads(r[0]) for r in reversed(rows)]
+            last_ops = {
+                p: json.loads(t)
+                for p, t in conn.execute("SELECT person, tasks FROM last_ops WHERE namespace = ?", (namespace,))
+            }
+            counts = conn.execute(
+                "SELECT person, count FROM weekly_counts WHERE namespace = ? AND week = ?",
+                (namespace, current_week),
+            ).fetchall()
+            row = conn.execute("SELECT data FROM previews WHERE namespace = ?", (namespace,)).fetchone()
+            preview = json.loads(row[0]) if row else None
+            last_onboarding = self._get_meta(conn, _ns_key("last_onboarding", namespace), [])
+        weekly = {"week": current_week, "assignments": dict(counts)}
+        return selections, last_ops, weekly, preview, last_onboarding
+
+    def save_history(self, selected, ops, weekly, onboarding_people, namespace="", today=None):
+        """Record a run: append the selection, replace last_ops, upsert weekly counts, clear the preview.
+
+        With `today`, plan days before it are dropped, as the JSON backend does.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO selections (people, namespace) VALUES (?, ?)",
+                (json.dumps(selected), namespace),
+            )
+            conn.execute(
+                "DELETE FROM selections WHERE namespace = ? AND seq NOT IN "
+                "(SELECT seq FROM selections WHERE namespace = ? ORDER BY seq DESC LIMIT 2)",
+                (namespace, namespace),
+            )
+            conn.execute("DELETE FROM last_ops WHERE namespace = ?", (namespace,))
+            conn.executemany(
+                "INSERT INTO last_ops (namespace, person, tasks) VALUES (?, ?, ?)",
+                [(namespace, p, json.dumps(t)) for p, t in ops.items()],
+            )
+            week = weekly["week"]
+            conn.executemany(
+                "INSERT INTO weekly_counts (namespace, week, person, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(namespace, week, person) DO UPDATE SET count = excluded.count",
+                [(namespace, week, p, weekly["assignments"][p]) for p in selected],
+            )
+            conn.execute("DELETE FROM weekly_counts WHERE namespace = ? AND week < ?", (namespace, week))
+            self._set_meta(conn, _ns_key("last_onboarding", namespace), onboarding_people)
+            conn.execute("DELETE FROM previews WHERE namespace = ?", (namespace,))
+            plan_key = _ns_key("plan", namespace)
+            plan = self._get_meta(conn, plan_key, {})
+            if today and plan:
+                self._set_meta(conn, plan_key, {d: entry for d, entry in plan.items() if d >= today})
+
+    def save_preview(self, preview_data, namespace=""):
+        """Replace the locked-in preview."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO previews (namespace, target_date, data) VALUES (?, ?, ?)",
+                (namespace, preview_data.get("target_date", ""), json.dumps(preview_data)),
+            )
+
+    def save_plan(self, plan, namespace=""):
+        with self._connect() as conn:
+            self._set_meta(conn, _ns_key("plan", namespace), plan)
+
+    def load_plan(self, namespace=""):
+        with self._connect() as conn:
+            return self._get_meta(conn, _ns_key("plan", namespace), {})
+
+    # ---- Single-date unavailability ----
+
+    def people_on_date(self, date_key):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT person FROM date_overrides WHERE date = ?", (date_key,))
+            return {r[0] for r in rows}
+
+    def load_unavailable(self, today):
+        """Return {date: [people]} for today onwards, like unavailable.json."""
+        data = {}
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT date, person FROM date_overrides WHERE date >= ? ORDER BY date, rowid",
+                (today,),
+            )
+            for date_key, person in rows:
+                data.setdefault(date_key, []).append(person)
+        return data
+
+    def apply_unavailable(self, dates, ranges, today):
+        """Replace people on several dates ({date: people}) and add ranges in one transaction.
+
+        Ranges already stored with the same person, start and end are not added
+        again. Returns the stored entry for each of `ranges`.
+        """
+        stored = []
+        with self._connect() as conn:
+            if dates:
+                conn.execute("DELETE FROM date_overrides WHERE date < ?", (today,))
+                conn.executemany("DELETE FROM date_overrides WHERE date = ?", [(d,) for d in dates])
+                conn.executemany(
+                    "INSERT OR IGNORE INTO date_overrides (date, person) VALUES (?, ?)",
+                    [(d, p) for d, people in dates.items() if d >= today for p in people],
+                )
+                self._bump(conn, "unavailable")
+            if ranges:
+                conn.execute("DELETE FROM ranges WHERE end < ?", (today,))
+                for r in ranges:
+                    span = (r["person"], r["start"], r["end"])
+                    row = conn.execute(
+                        "SELECT uid FROM ranges WHERE person = ? AND start = ? AND end = ? ORDER BY id LIMIT 1",
+                        span,
+                    ).fetchone()
+                    if row is None:
+                        cur = conn.execute(
+                            f"INSERT INTO ranges (person, start, end, uid) "
+                            f"VALUES (?, ?, ?, COALESCE(?, {NEW_RANGE_ID}))",
+                            (*span, r.get("id")),
+                        )
+                        row = conn.execute("SELECT uid FROM ranges WHERE id = ?", (cur.lastrowid,)).fetchone()
+                    stored.append({"id": row[0], "person": span[0], "start": span[1], "end": span[2]})
+                self._bump(conn, "ranges")
+        return stored
+
+    # ---- Ranges ----
+
+    def load_ranges(self):
+        """Return all ranges as [{"id", "person", "start", "end"}] in insertion order."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT uid, person, start, end FROM ranges ORDER BY id")
+            return [{"id": u, "person": p, "start": s, "end": e} for u, p, s, e in rows]
+
+    def get_range(self, range_id):
+        """Return the range with this id, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT uid, person, start, end FROM ranges WHERE uid = ?", (range_id,)
+            ).fetchone()
+        return None if row is None else dict(zip(("id", "person", "start", "end"), row))
+
+    def people_in_ranges(self, date_key):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT person FROM ranges WHERE start <= ? AND end >= ?",
+                (date_key, date_key),
+            )
+            return {r[0] for r in rows}
+
+    def delete_range(self, range_id):
+        """Delete the range with this id. Returns False if there is none."""
+        with self._connect() as conn:
+            deleted = conn.execute("DELETE FROM ranges WHERE uid = ?", (range_id,)).rowcount
+            if deleted:
+                self._bump(conn, "ranges")
+            return bool(deleted)
+
+    def update_range(self, range_id, entry):
+        """Replace person/start/end of the range with this id. Returns False if there is none."""
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE ranges SET person = ?, start = ?, end = ? WHERE uid = ?",
+                (entry["person"], entry["start"], entry["end"], range_id),
+            ).rowcount
+            if updated:
+                self._bump(conn, "ranges")
+            return bool(updated)
+
+    def delete_range_at(self, idx):
+        """Delete the range at list position idx. Returns False if out of range."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT id FROM ranges ORDER BY id LIMIT 1 OFFSET ?", (idx,)).fetchone()
+            if row is None or idx < 0:
+                return False
+            conn.execute("DELETE FROM ranges WHERE id = ?", (row[0],))
+            self._bump(conn, "ranges")
+            return True
+
+    # ---- Migration ----
+
+    def import_json(self, history_file, unavailable_file, ranges_file):
+        """One-shot import of the JSON state files. Existing rows are replaced.
+
+        Imports the single-team history (namespace ""); per-rotation history
+        files start fresh.
+        """
+        def read(path, default):
+            if not path.exists():
+                return default
+            try:
+                return json.loads(path.read_text())
+            except (json.JSONDecodeError, OSError):
+                logger.warning("Skipping unreadable %s", path)
+                return default
+
+        history = read(history_file, {})
+        unavailable = read(unavailable_file, {})
+        ranges = read(ranges_file, [])
+
+        with self._connect() as conn:
+            for table in ("selections", "last_ops", "weekly_counts", "previews",
+                          "date_overrides", "ranges"):
+                conn.execute(f"DELETE FROM {table}")
+            # Keep the generation counters: caches rely on them only moving forward
+            conn.execute("DELETE FROM meta WHERE key NOT LIKE '%!_version' ESCAPE '!'")
+            conn.executemany(
+                "INSERT INTO selections (people) VALUES (?)",
+                [(json.dumps(s),) for s in history.get("last_selections", [])[-2:]],
+            )
+            last_ops = history.get("last_ops", {})
+            if isinstance(last_ops, dict):
+                conn.executemany(
+                    "INSERT INTO last_ops (person, tasks) VALUES (?, ?)",
+                    [(p, json.dumps(t)) for p, t in last_ops.items()],
+                )
+            weekly = history.get("weekly_servicedesk", {})
+            conn.executemany(
+                "INSERT INTO weekly_counts (week, person, count) VALUES (?, ?, ?)",
+                [(weekly.get("week", ""), p, c) for p, c in weekly.get("assignments", {}).items()],
+            )
+            preview = history.get("next_day_selection")
+            if preview:
+                conn.execute(
+                    "INSERT INTO previews (namespace, target_date, data) VALUES ('', ?, ?)",
+                    (preview.get("target_date", ""), json.dumps(preview)),
+                )
+            self._set_meta(conn, "last_onboarding", history.get("last_onboarding", []))
+            if isinstance(unavailable, dict):
+                conn.executemany(
+                    "INSERT OR IGNORE INTO date_overrides (date, person) VALUES (?, ?)",
+                    [(d, p) for d, people in unavailable.items() for p in people],
+                )
+            if isinstance(ranges, list):
+                conn.executemany(
+                    f"INSERT INTO ranges (person, start, end, uid) VALUES (?, ?, ?, COALESCE(?, {NEW_RANGE_ID}))",
+                    [(r.get("person", ""), r.get("start", ""), r.get("end", ""), r.get("id") or None)
+                     for r in ranges if isinstance(r, dict)],
+                )
+            self._bump(conn, "unavailable")
+            self._bump(conn, "ranges")
+
+        logger.info(
+            "Imported %d date overrides and %d ranges into %s",
+            sum(len(p) for p in unavailable.values()) if isinstance(unavailable, dict) else 0,
+            len(ranges) if isinstance(ranges, list) else 0,
+            self.path,
+        )
+
+
+if __name__ == "__main__":
+    import bot
+
+    if sys.argv[1:] != ["import"]:
+        print("usage: python sqlite_store.py import", file=sys.stderr)
+        sys.exit(2)
+    SqliteStore(bot.SQLITE_FILE).import_json(
+        bot.HISTORY_FILE, bot.UNAVAILABLE_FILE, bot.UNAVAILABLE_RANGES_FILE
+    )
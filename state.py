@@ -0,0 +1,153 @@
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# path -> (version, data, {build_fn: derived})
+_cache = {}
+_stats = {"hits": 0, "misses": 0}
+_lock = threading.Lock()
+
+
+def file_version(path):
+    """Return (path, st_ino, st_mtime_ns, st_size) for a file, or None if it can't be stat'ed.
+
+    write_json replaces the file, so the inode changes on every write even when
+    mtime and size don't (coarse mtime granularity, same-size content).
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (str(path), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def load_json(path, default, build=None):
+    """Load a JSON state file, re-parsing only when the file has changed.
+
+    The parsed object is cached keyed by file_version() and shared between
+    callers, so treat it as read-only and copy before mutating. Read-modify-write
+    cycles must use read_json under locked() instead: another process can write
+    a file whose version looks unchanged.
+
+    Args:
+        path: Path of the JSON file
+        default: value returned if the file is missing or unreadable
+        build: optional function applied to the parsed data; its result is
+            cached alongside the data and returned instead (e.g. an index)
+
+    Returns: parsed data (or build(data)), or default
+    """
+    version = file_version(path)
+    if version is None:
+        return default
+
+    key = str(path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[0] == version:
+            if build is None:
+                _stats["hits"] += 1
+                return entry[1]
+            if build in entry[2]:
+                _stats["hits"] += 1
+                return entry[2][build]
+
+    if entry and entry[0] == version:
+        data = entry[1]
+    else:
+        try:
+            data = json.loads(path.read_text())
+        except (json.JSONDecodeError, OSError):
+            logger.debug("Could not parse %s; using default", path)
+            return default
+    result = data if build is None else build(data)
+
+    with _lock:
+        _stats["misses"] += 1
+        entry = _cache.get(key)
+        if not entry or entry[0] != version:
+            entry = (version, data, {})
+            _cache[key] = entry
+        if build is not None:
+            entry[2][build] = result
+    return result
+
+
+def read_json(path, default):
+    """Parse a JSON state file straight from disk, bypassing the cache.
+
+    Returns a fresh object the caller may mutate, or default if the file is
+    missing or unreadable.
+    """
+    try:
+        return json.loads(path.read_text())
+    except (json.JSONDecodeError, OSError):
+        logger.debug("Could not parse %s; using default", path)
+        return default
+
+
+def invalidate(path):
+    """Drop any cached copy of a file (call after writing it)."""
+    with _lock:
+        _cache.pop(str(path), None)
+
+
+def cache_stats():
+    """Return a snapshot of the loader's hit/miss counters."""
+    with _lock:
+        return dict(_stats)
+
+
+@contextmanager
+def locked(path):
+    """Hold an exclusive advisory lock on <path>.lock for the duration of the block.
+
+    Serializes read-modify-write cycles across threads, processes and gunicorn
+    workers sharing the same volume. Readers don't need it: writes are atomic.
+    """
+    lock_path = path.with_name(path.name + ".lock")
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_json(path, data, **dump_kwargs):
+    """Atomically replace a JSON file (temp file in the same directory + os.replace)."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        invalidate(path)
+
+
+def update_json(path, default, update, **dump_kwargs):
+    """Locked read-modify-write of a JSON file.
+
+    update receives the current data, read from disk under the lock (never
+    from the cache), and must return the new object to write. Returns the
+    written data.
+    """
+    with locked(path):
+        data = update(read_json(path, default))
+        write_json(path, data, **dump_kwargs)
+    return data
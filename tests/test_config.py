@@ -0,0 +1,43 @@
+"""load_config: numeric settings are parsed and validated with the rest of the snapshot.
+
+    python -m pytest tests/
+"""
+import unittest
+
+import bot
+
+
+class NumericSettingsTest(unittest.TestCase):
+    def test_defaults(self):
+        config = bot.load_config({})
+        self.assertEqual(config.slack_max_retries, 3)
+        self.assertEqual(config.weekly_need_weight, 3.0)
+        self.assertEqual(config.rotation_workers, 8)
+
+    def test_parsed_from_environ(self):
+        config = bot.load_config({"SLACK_MAX_RETRIES": " 5 ", "WEEKLY_NEED_WEIGHT": "1.5", "CONFIG_POLL_SECONDS": "0"})
+        self.assertEqual(config.slack_max_retries, 5)
+        self.assertEqual(config.weekly_need_weight, 1.5)
+        self.assertEqual(config.config_poll_seconds, 0)
+
+    def test_invalid_values_rejected(self):
+        for env in ({"SLACK_MAX_RETRIES": "three"}, {"SLACK_MAX_RETRIES": "2.5"}, {"SLACK_MAX_RETRIES": "-1"},
+                    {"WEEKLY_NEED_WEIGHT": "0"}, {"WEEKLY_NEED_WEIGHT": "-2"}, {"WEEKLY_NEED_WEIGHT": "nan"},
+                    {"ROTATION_WORKERS": "0"}, {"ROTATION_TIMEOUT": "inf"}):
+            with self.subTest(env=env), self.assertRaisesRegex(ValueError, next(iter(env))):
+                bot.load_config(env)
+
+    def test_reload_keeps_snapshot_on_invalid_value(self):
+        self.addCleanup(bot.reload_config)
+        current = bot.reload_config({"WEEKLY_NEED_WEIGHT": "2"})
+        with self.assertRaises(ValueError):
+            bot.reload_config({"WEEKLY_NEED_WEIGHT": "0"})
+        self.assertIs(bot.get_config(), current)
+
+    def test_webhook_comes_from_environ(self):
+        config = bot.load_config({"SLACK_WEBHOOK_URL": "https://hooks.example/x"})
+        self.assertEqual(config.default_rotation.webhook_url, "https://hooks.example/x")
+
+
+if __name__ == "__main__":
+    unittest.main()
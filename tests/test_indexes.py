@@ -0,0 +1,143 @@
+"""RangeIndex and DateOverrideIndex against brute-force scans, and cursor pagination.
+
+    python -m pytest tests/
+"""
+import random
+import unittest
+from datetime import date, timedelta
+
+import bot
+
+PEOPLE = ["Alex", "Ed", "Gibran", "Mirage", "Paul"]
+
+
+def day(n):
+    return (date(2027, 1, 1) + timedelta(days=n)).isoformat()
+
+
+def make_ranges(rng, count, with_ids=True):
+    ranges = []
+    for i in range(count):
+        start = rng.randrange(60)
+        entry = {"person": rng.choice(PEOPLE), "start": day(start), "end": day(start + rng.randrange(10))}
+        if with_ids:
+            entry["id"] = f"r{i:016x}"
+        ranges.append(entry)
+    return ranges
+
+
+def overlapping(ranges, start, end):
+    return [r for r in ranges if r["start"] <= end and r["end"] >= start]
+
+
+def pages(index, **window):
+    """Every entry from paging through index.query, following the cursors."""
+    seen, after = [], None
+    while True:
+        pairs, after = index.query(after=after, **window)
+        seen.extend(entry for _, entry in pairs)
+        if after is None:
+            return seen
+
+
+class RangeIndexTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        for count in (0, 1, 2, 7, 64, 500):
+            ranges = make_ranges(rng, count)
+            # Entries the index must skip
+            ranges += ["junk", {"person": "Ed", "start": day(9), "end": day(3)},
+                       {"start": day(1), "end": day(2)}]
+            index = bot.RangeIndex(ranges)
+            for _ in range(50):
+                a, b = sorted((rng.randrange(-5, 75), rng.randrange(-5, 75)))
+                with self.subTest(count=count, start=day(a), end=day(b)):
+                    expected = overlapping(ranges[:count], day(a), day(b))
+                    self.assertEqual([e for _, e in index.entries_between(day(a), day(b))], expected)
+                    covering = overlapping(ranges[:count], day(a), day(a))
+                    self.assertEqual(index.people_on(day(a)), {r["person"] for r in covering})
+
+    def test_accepts_dates(self):
+        index = bot.RangeIndex([{"person": "Ed", "start": day(0), "end": day(3)}])
+        self.assertEqual(index.people_on(date(2027, 1, 2)), {"Ed"})
+        self.assertEqual(index.people_on(date(2027, 1, 5)), set())
+
+
+class RangePaginationTest(unittest.TestCase):
+    def test_pages_cover_every_match_once(self):
+        ranges = make_ranges(random.Random(1), 300)
+        index = bot.RangeIndex(ranges)
+        for window in ({}, {"start": day(10), "end": day(20)}, {"person": "ed", "start": day(30)}):
+            with self.subTest(window=window):
+                got = pages(index, limit=7, **window)
+                expected = overlapping(ranges, window.get("start", ""), window.get("end", "9999-12-31"))
+                if "person" in window:
+                    expected = [r for r in expected if r["person"].casefold() == window["person"]]
+                self.assertEqual(sorted(r["id"] for r in got), sorted(r["id"] for r in expected))
+                self.assertEqual(len(got), len(expected))
+                self.assertEqual([r["start"] for r in got], sorted(r["start"] for r in got))
+
+    def test_cursor_survives_deletes_and_inserts(self):
+        entry = {"person": "Ed", "start": day(1), "end": day(2)}
+        ranges = [{**entry, "id": f"r{i}"} for i in range(6)]
+        pairs, cursor = bot.RangeIndex(ranges).query(limit=3)
+        self.assertEqual([e["id"] for _, e in pairs], ["r0", "r1", "r2"])
+
+        # r0 deleted and a new entry inserted at the front between the two fetches
+        changed = [{**entry, "id": "r9"}] + ranges[1:]
+        pairs, _ = bot.RangeIndex(changed).query(after=cursor, limit=10)
+        self.assertEqual([e["id"] for _, e in pairs], ["r3", "r4", "r5", "r9"])
+
+    def test_legacy_duplicates_without_ids_all_paged(self):
+        ranges = [{"person": "Ed", "start": day(1), "end": day(2)} for _ in range(5)]
+        self.assertEqual(len(pages(bot.RangeIndex(ranges), limit=2)), 5)
+
+    def test_invalid_cursor(self):
+        index = bot.RangeIndex(make_ranges(random.Random(2), 5))
+        for after in ("x", [day(1), day(2), "Ed", "r1"], [day(1), day(2), "Ed", "r1", "0"]):
+            with self.assertRaises(ValueError):
+                index.query(after=after)
+
+
+class DateOverrideIndexTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(4)
+        self.data = {day(n): rng.sample(PEOPLE, rng.randrange(3)) for n in range(0, 90, 2)}
+        self.data["junk"] = "not a list"
+        self.index = bot.DateOverrideIndex(self.data)
+
+    def expected(self, start="", end="9999-12-31", person=None):
+        result = {}
+        for d, people in sorted(self.data.items()):
+            if not isinstance(people, list) or not people or not start <= d <= end:
+                continue
+            if person is not None:
+                people = [p for p in people if p.casefold() == person.casefold()]
+                if not people:
+                    continue
+            result[d] = people
+        return result
+
+    def test_window_and_person(self):
+        for window in ({}, {"start": day(10), "end": day(30)}, {"person": "PAUL"}, {"end": day(5), "person": "ed"}):
+            with self.subTest(window=window):
+                self.assertEqual(self.index.query(**window)[0], self.expected(**window))
+
+    def test_pages_cover_every_date_once(self):
+        got, after = {}, None
+        while True:
+            page, after = self.index.query(start=day(7), after=after, limit=4)
+            self.assertLessEqual(len(page), 4)
+            self.assertFalse(set(page) & set(got))
+            got.update(page)
+            if after is None:
+                break
+        self.assertEqual(got, self.expected(start=day(7)))
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.index.query(after=["2027-01-01"])
+
+
+if __name__ == "__main__":
+    unittest.main()
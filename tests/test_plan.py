@@ -0,0 +1,69 @@
+"""plan_schedule and get_planned_day against throwaway JSON state files.
+
+    python -m pytest tests/
+"""
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import bot
+
+
+class PlanTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        patches = [
+            mock.patch.object(bot, "STORAGE_BACKEND", "json"),
+            mock.patch.object(bot, "HISTORY_FILE", self.tmp / "history.json"),
+            mock.patch.object(bot, "UNAVAILABLE_FILE", self.tmp / "unavailable.json"),
+            mock.patch.object(bot, "UNAVAILABLE_RANGES_FILE", self.tmp / "ranges.json"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(bot.reload_config)
+        bot.reload_config({"SIMULATE_DAY": "Monday"})
+        self.rotation = bot.get_default_rotation()
+        self.monday = datetime(2027, 1, 4, tzinfo=bot.LOCAL_TZ)
+
+    def test_each_day_uses_its_own_weekday_under_simulate_day(self):
+        with mock.patch.object(bot, "run_selection", wraps=bot.run_selection) as run_selection:
+            days = bot.plan_schedule(self.rotation, start=self.monday, weeks=1)
+        self.assertEqual([d["target_date"] for d in days],
+                         ["2027-01-04", "2027-01-05", "2027-01-06", "2027-01-07", "2027-01-08"])
+        self.assertEqual([d["onboarding_type"] for d in days], ["FTE", "Contractor", None, None, None])
+        # Remaining workdays count down from the planned day, not from SIMULATE_DAY
+        self.assertEqual([c.args[7] for c in run_selection.call_args_list], [5, 4, 3, 2, 1])
+        # Alex is only excluded on Monday
+        self.assertNotIn("Alex", days[0]["selected"])
+        self.assertNotIn("Alex", days[0]["assignments"])
+        self.assertTrue(any("Alex" in d["selected"] or "Alex" in d["assignments"] for d in days[1:]))
+
+    def test_plan_never_selects_three_days_in_a_row(self):
+        days = bot.plan_schedule(self.rotation, start=self.monday, weeks=4)
+        for a, b, c in zip(days, days[1:], days[2:]):
+            self.assertFalse(set(a["selected"]) & set(b["selected"]) & set(c["selected"]))
+
+    def test_planned_day_used_until_it_breaks_a_rule(self):
+        days = bot.plan_schedule(self.rotation, start=self.monday, weeks=1)
+        bot.save_plan({d["target_date"]: d for d in days})
+        entry = days[2]
+        roster = self.rotation.roster
+        self.assertEqual(bot.get_planned_day(self.rotation, "2027-01-06", 0), entry)
+        self.assertIsNone(bot.get_planned_day(self.rotation, "2027-01-13", 0))
+
+        # Someone planned that day has since become unavailable
+        unavailable = roster.mask_of([entry["selected"][0]])
+        self.assertIsNone(bot.get_planned_day(self.rotation, "2027-01-06", unavailable))
+
+        # Re-selected earlier days put a planned person on Service Desk twice already
+        history_excluded = {entry["selected"][1]}
+        self.assertIsNone(bot.get_planned_day(self.rotation, "2027-01-06", 0, history_excluded))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""run_rotations deadlines: an overrunning rotation stops before its side effects.
+
+    python -m pytest tests/
+"""
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import bot
+
+
+class RunRotationsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patch = mock.patch.object(bot, "LAST_RUN_FILE", Path(tmp.name) / "last_run.json")
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.sent = []
+
+    def run_rotation(self, rotation):
+        time.sleep(rotation.work)
+        bot.check_deadline("sending to Slack")
+        self.sent.append(rotation.name)
+
+    def test_overrunning_rotation_stops_before_side_effects(self):
+        rotations = [SimpleNamespace(name="slow", work=0.3), SimpleNamespace(name="fast", work=0)]
+        stats = bot.run_rotations(self.run_rotation, rotations, max_workers=1, timeout=0.1)
+        self.assertEqual(stats["slow"]["status"], "timeout")
+        self.assertEqual(stats["fast"]["status"], "ok")
+        self.assertEqual(self.sent, ["fast"])
+        self.assertEqual(bot.load_last_run(), stats)
+
+    def test_failure_reported(self):
+        def run(rotation):
+            raise RuntimeError("boom")
+
+        stats = bot.run_rotations(run, [SimpleNamespace(name="a")], timeout=5)
+        self.assertEqual(stats["a"]["status"], "failed")
+
+    def test_no_deadline_outside_run_rotations(self):
+        bot.check_deadline("anything")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""The NumPy Service Desk kernel against the pure-Python draw (skipped without NumPy).
+
+    python -m pytest tests/
+"""
+import random
+import unittest
+
+import bot
+import selection_kernel
+
+PEOPLE = [f"p{i}" for i in range(20)]
+
+
+@unittest.skipUnless(selection_kernel.available(), "NumPy not installed")
+class KernelTest(unittest.TestCase):
+    def select(self, vectorized, **kwargs):
+        bot.reload_config({"VECTOR_SELECTION_MIN_PEOPLE": "1" if vectorized else str(10 ** 9)})
+        self.addCleanup(bot.reload_config)
+        return bot.run_selection(bot.get_roster(PEOPLE), bot.OPERATIONS, day_name="wednesday", **kwargs)
+
+    def test_exclusions_respected(self):
+        random.seed(1)
+        roster = bot.get_roster(PEOPLE)
+        day_excluded = roster.mask_of(PEOPLE[:15])
+        for _ in range(50):
+            selected, _ = self.select(True, history_excluded={"p15", "p16"}, day_excluded=day_excluded,
+                                      weekly={"week": "w", "assignments": {}})
+            self.assertEqual(len(selected), 2)
+            self.assertTrue(set(selected) <= {"p17", "p18", "p19"})
+
+    def test_history_exclusion_dropped_when_short(self):
+        random.seed(2)
+        day_excluded = bot.get_roster(PEOPLE).mask_of(PEOPLE[:18])
+        selected, _ = self.select(True, history_excluded={"p18", "p19"}, day_excluded=day_excluded)
+        self.assertEqual(sorted(selected), ["p18", "p19"])
+
+    def test_weekly_minimum_logged_on_both_paths(self):
+        weekly = {"week": "w", "assignments": {p: 1 for p in PEOPLE[:17]}}
+        for vectorized in (False, True):
+            with self.subTest(vectorized=vectorized), self.assertLogs(bot.logger, "INFO") as logs:
+                selected, _ = self.select(vectorized, weekly=weekly, remaining_days=1)
+            self.assertTrue(set(selected) <= {"p17", "p18", "p19"})
+            self.assertTrue(any("Weekly minimum enforcement" in line for line in logs.output))
+
+
+if __name__ == "__main__":
+    unittest.main()
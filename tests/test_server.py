@@ -0,0 +1,145 @@
+"""Control-panel API against throwaway JSON state files.
+
+    python -m pytest tests/
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import bot
+import server
+
+
+class ServerTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        tmp = Path(tmp.name)
+        patches = [
+            mock.patch.object(bot, "STORAGE_BACKEND", "json"),
+            mock.patch.object(server, "PANEL_PASSWORD", ""),
+        ]
+        for module in (bot, server):
+            patches += [
+                mock.patch.object(module, "UNAVAILABLE_FILE", tmp / "unavailable.json"),
+                mock.patch.object(module, "UNAVAILABLE_RANGES_FILE", tmp / "ranges.json"),
+            ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = server.app.test_client()
+
+    def add_range(self, person, start, end):
+        response = self.client.post("/api/unavailable-ranges", json={"person": person, "start": start, "end": end})
+        self.assertEqual(response.status_code, 200, response.json)
+        return response.json["range"]
+
+
+class WindowArgsTest(unittest.TestCase):
+    def test_no_window(self):
+        self.assertIsNone(server.parse_window_args({}, server.DATE_CURSOR))
+
+    def test_parsed_and_normalized(self):
+        cursor = server.encode_cursor("2027-01-04")
+        window = server.parse_window_args(
+            {"from": "2027-1-3", "to": "2027-02-01", "person": " Ed ", "limit": "5", "cursor": cursor},
+            server.DATE_CURSOR,
+        )
+        self.assertEqual(window, {"start": "2027-01-03", "end": "2027-02-01", "person": "Ed",
+                                  "after": "2027-01-04", "limit": 5})
+
+    def test_rejected(self):
+        for args in ({"from": "tomorrow"}, {"limit": "0"}, {"limit": str(server.MAX_PAGE_SIZE + 1)},
+                     {"limit": "-1"}, {"cursor": "%%%"}, {"cursor": server.encode_cursor(["a", "b"])}):
+            with self.subTest(args=args), self.assertRaises(ValueError):
+                server.parse_window_args(args, server.DATE_CURSOR)
+
+    def test_cursor_round_trip(self):
+        key = ["2027-01-01", "2027-01-02", "Ed", "r1", -1]
+        self.assertEqual(server.decode_cursor(server.encode_cursor(key), server.RANGE_CURSOR), key)
+        with self.assertRaises(ValueError):
+            server.decode_cursor(server.encode_cursor(key[:4]), server.RANGE_CURSOR)
+
+
+class RangesEndpointTest(ServerTestCase):
+    def test_paged_window(self):
+        ids = [self.add_range("Ed", f"2027-01-{d:02d}", "2027-01-20")["id"] for d in range(1, 8)]
+        seen, cursor = [], None
+        while True:
+            query = {"from": "2027-01-03", "limit": 3, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get("/api/unavailable-ranges", query_string=query)
+            self.assertEqual(response.status_code, 200)
+            seen += [r["id"] for r in response.json]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        self.assertEqual(seen, ids)
+
+    def test_date_normalized(self):
+        entry = self.add_range("Ed", "2027-01-01", "2027-01-05")
+        for query in ({"date": "2027-1-3"}, {"date": "2027-1-3", "limit": 5}):
+            response = self.client.get("/api/unavailable-ranges", query_string=query)
+            self.assertEqual(response.json, [entry])
+
+    def test_bad_cursor(self):
+        response = self.client.get("/api/unavailable-ranges", query_string={"cursor": "bogus"})
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkTest(ServerTestCase):
+    def post(self, body):
+        return self.client.post("/api/unavailable/bulk", json=body)
+
+    def test_applies_batch(self):
+        response = self.post({
+            "dates": [{"date": "2027-01-04", "people": ["Ed"]}, {"date": "2027-01-05", "people": ["Paul"]}],
+            "ranges": [{"person": "Alex", "start": "2027-02-01", "end": "2027-02-10"}],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json["ok"])
+        self.assertEqual(self.client.get("/api/unavailable").json, {"2027-01-04": ["Ed"], "2027-01-05": ["Paul"]})
+        ranges = self.client.get("/api/unavailable-ranges").json
+        self.assertEqual(ranges, [response.json["ranges"][0]["range"]])
+
+    def test_invalid_item_writes_nothing(self):
+        response = self.post({
+            "dates": [{"date": "2027-01-04", "people": ["Ed"]}],
+            "ranges": [{"person": "Alex", "start": "2027-02-01", "end": "2027-02-10"},
+                       {"person": "Nobody", "start": "2027-02-01", "end": "2027-02-10"}],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([r["ok"] for r in response.json["ranges"]], [True, False])
+        self.assertEqual(self.client.get("/api/unavailable").json, {})
+        self.assertEqual(self.client.get("/api/unavailable-ranges").json, [])
+
+    def test_retry_does_not_duplicate_ranges(self):
+        body = {"ranges": [{"person": "Alex", "start": "2027-2-1", "end": "2027-02-10"},
+                           {"person": "Alex", "start": "2027-02-01", "end": "2027-02-10"}]}
+        first = [r["range"]["id"] for r in self.post(body).json["ranges"]]
+        second = [r["range"]["id"] for r in self.post(body).json["ranges"]]
+        self.assertEqual(len(set(first + second)), 1)
+        self.assertEqual(len(self.client.get("/api/unavailable-ranges").json), 1)
+
+    def test_rejects_non_lists(self):
+        self.assertEqual(self.post({"dates": {}}).status_code, 400)
+        self.assertEqual(self.post([]).status_code, 400)
+
+
+class SqliteBulkTest(BulkTest):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patches = [
+            mock.patch.object(bot, "STORAGE_BACKEND", "sqlite"),
+            mock.patch.object(bot, "SQLITE_FILE", Path(tmp.name) / "bot.db"),
+            mock.patch.object(bot, "_store", None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""post_to_slack against a local HTTP stand-in for the Slack webhook.
+
+    python -m pytest tests/
+    python -m unittest discover tests
+"""
+import functools
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import bot
+from outbox import Outbox, RetryLater
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Answers POSTs with the next (status, headers) from the server's script."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests += 1
+        status, headers = self.server.script.pop(0) if self.server.script else (200, {})
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PostToSlackTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+        self.server.script = []
+        self.server.requests = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+        # Record the waits instead of sleeping through them
+        self.delays = []
+        patch = mock.patch.object(bot.time, "sleep", self.delays.append)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.config = bot.reload_config({"SLACK_MAX_RETRIES": "3", "SLACK_BACKOFF_MAX": "30"})
+        self.addCleanup(bot.reload_config)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_delivered_first_time(self):
+        self.assertEqual(bot.post_to_slack("hi", self.url), bot.DELIVERED)
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(self.delays, [])
+
+    def test_429_waits_retry_after(self):
+        self.server.script = [(429, {"Retry-After": "7"})]
+        self.assertEqual(bot.post_to_slack("hi", self.url), bot.RETRIED)
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(self.delays, [7.0])
+
+    def test_long_retry_after_not_retried_early(self):
+        self.server.script = [(429, {"Retry-After": "3600"})]
+        self.assertEqual(bot.post_to_slack("hi", self.url), bot.DROPPED)
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(self.delays, [])
+
+    def test_long_retry_after_deferred_to_outbox(self):
+        self.server.script = [(429, {"Retry-After": "3600"})]
+        with tempfile.TemporaryDirectory() as tmp:
+            box = Outbox(Path(tmp) / "outbox.db", functools.partial(bot.post_to_slack, defer=True),
+                         success={bot.DELIVERED, bot.RETRIED})
+            box.enqueue("morning:2027-01-04", "hi", self.url)
+            outcome = box.drain()["morning:2027-01-04"]
+            self.assertIsInstance(outcome, RetryLater)
+            self.assertEqual(outcome.delay, 3600.0)
+            self.assertEqual(box.status("morning:2027-01-04"), "pending")
+            # Rescheduled for later rather than slept on
+            self.assertEqual(box.drain(), {})
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(self.delays, [])
+
+    def test_5xx_retried_with_capped_backoff(self):
+        self.server.script = [(503, {}), (500, {})]
+        self.assertEqual(bot.post_to_slack("hi", self.url), bot.RETRIED)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(len(self.delays), 2)
+        self.assertTrue(all(0 <= d <= self.config.slack_backoff_base * 2 for d in self.delays))
+
+    def test_gives_up_after_max_retries(self):
+        self.server.script = [(503, {})] * 10
+        self.assertEqual(bot.post_to_slack("hi", self.url), bot.DROPPED)
+        self.assertEqual(self.server.requests, self.config.slack_max_retries + 1)
+        self.assertEqual(len(self.delays), self.config.slack_max_retries)
+
+    def test_outbox_lease_outlasts_slowest_post(self):
+        bot.reload_config({"SLACK_MAX_RETRIES": "5", "SLACK_BACKOFF_MAX": "60"})
+        # 6 attempts of up to 2 timeouts each, 5 waits of up to 60s
+        self.assertEqual(bot.slack_post_seconds(), 6 * 2 * bot.SLACK_TIMEOUT + 5 * 60)
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.object(bot, "OUTBOX_FILE", Path(tmp) / "outbox.db"), \
+                mock.patch.object(bot, "_outbox", None):
+            self.assertGreater(bot.get_outbox().lease_seconds, bot.slack_post_seconds())
+
+    def test_permanent_error_not_retried(self):
+        self.server.script = [(404, {})]
+        self.assertEqual(bot.post_to_slack("hi", self.url), bot.DROPPED)
+        self.assertEqual(self.server.requests, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
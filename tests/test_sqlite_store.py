@@ -0,0 +1,97 @@
+"""SqliteStore schema migrations from older database files.
+
+    python -m pytest tests/
+"""
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlite_store import SCHEMA, SCHEMA_VERSION, SqliteStore
+
+# The first released schema: no rotation namespaces, no range ids
+SCHEMA_V1 = """
+CREATE TABLE selections (seq INTEGER PRIMARY KEY AUTOINCREMENT, people TEXT NOT NULL);
+CREATE TABLE last_ops (person TEXT PRIMARY KEY, tasks TEXT NOT NULL);
+CREATE TABLE weekly_counts (week TEXT NOT NULL, person TEXT NOT NULL, count INTEGER NOT NULL,
+                            PRIMARY KEY (week, person));
+CREATE TABLE previews (target_date TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE date_overrides (date TEXT NOT NULL, person TEXT NOT NULL, PRIMARY KEY (date, person));
+CREATE TABLE ranges (id INTEGER PRIMARY KEY AUTOINCREMENT, person TEXT NOT NULL,
+                     start TEXT NOT NULL, end TEXT NOT NULL);
+"""
+
+# Version 2: namespaces, but ranges still without ids
+SCHEMA_V2 = SCHEMA.replace(",\n    uid TEXT\n", "\n").replace(
+    "CREATE UNIQUE INDEX IF NOT EXISTS ranges_uid ON ranges (uid);\n", ""
+)
+
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "bot.db"
+
+    def make_db(self, schema, version, namespaced):
+        conn = sqlite3.connect(str(self.path))
+        conn.executescript(schema)
+        ns = ("",) if namespaced else ()
+        cols = "namespace, " if namespaced else ""
+        marks = "?, " if namespaced else ""
+        for people in (["Ed", "Paul"], ["Ed", "Alex"]):
+            conn.execute(f"INSERT INTO selections ({cols}people) VALUES ({marks}?)", (*ns, json.dumps(people)))
+        conn.execute(f"INSERT INTO last_ops ({cols}person, tasks) VALUES ({marks}?, ?)",
+                     (*ns, "Gibran", json.dumps(["audit idle hardware"])))
+        conn.execute(f"INSERT INTO weekly_counts ({cols}week, person, count) VALUES ({marks}?, ?, ?)",
+                     (*ns, "2027-W01", "Ed", 2))
+        conn.execute(f"INSERT INTO previews ({cols}target_date, data) VALUES ({marks}?, ?)",
+                     (*ns, "2027-01-05", json.dumps({"target_date": "2027-01-05"})))
+        conn.executemany("INSERT INTO ranges (person, start, end) VALUES (?, ?, ?)",
+                         [("Ed", "2027-01-01", "2027-01-09"), ("Paul", "2027-02-01", "2027-02-03")])
+        conn.execute(f"PRAGMA user_version = {version}")
+        conn.commit()
+        conn.close()
+
+    def assert_migrated(self):
+        store = SqliteStore(self.path)
+        selections, last_ops, weekly, preview, _ = store.load_history("2027-W01")
+        self.assertEqual(selections, [["Ed", "Paul"], ["Ed", "Alex"]])
+        self.assertEqual(last_ops, {"Gibran": ["audit idle hardware"]})
+        self.assertEqual(weekly["assignments"], {"Ed": 2})
+        self.assertEqual(preview, {"target_date": "2027-01-05"})
+
+        ranges = store.load_ranges()
+        self.assertEqual([(r["person"], r["start"]) for r in ranges], [("Ed", "2027-01-01"), ("Paul", "2027-02-01")])
+        ids = [r["id"] for r in ranges]
+        self.assertTrue(all(i and i.startswith("r") for i in ids))
+        self.assertEqual(len(set(ids)), 2)
+        self.assertEqual(store.get_range(ids[1])["person"], "Paul")
+
+        # Namespaced tables work after the migration
+        store.save_history(["Mirage"], {}, {"week": "2027-W01", "assignments": {"Mirage": 1}}, [], "bayside")
+        self.assertEqual(store.load_history("2027-W01", "bayside")[0], [["Mirage"]])
+        self.assertEqual(store.load_history("2027-W01")[0], [["Ed", "Paul"], ["Ed", "Alex"]])
+
+        conn = sqlite3.connect(str(self.path))
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+        conn.close()
+
+    def test_from_v1(self):
+        self.make_db(SCHEMA_V1, 0, namespaced=False)
+        self.assert_migrated()
+
+    def test_from_v2(self):
+        self.make_db(SCHEMA_V2, 2, namespaced=True)
+        self.assert_migrated()
+
+    def test_reopening_current_schema_keeps_ids(self):
+        self.make_db(SCHEMA_V2, 2, namespaced=True)
+        first = [r["id"] for r in SqliteStore(self.path).load_ranges()]
+        self.assertEqual([r["id"] for r in SqliteStore(self.path).load_ranges()], first)
+
+
+if __name__ == "__main__":
+    unittest.main()
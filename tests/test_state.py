@@ -0,0 +1,90 @@
+"""state.py: the mtime-keyed JSON cache and locked read-modify-write.
+
+    python -m pytest tests/
+"""
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import state
+
+
+class StateTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "data.json"
+        self.addCleanup(state.invalidate, self.path)
+
+    def write_behind_cache(self, data):
+        """Rewrite the file in place keeping its mtime, as another worker might within mtime granularity."""
+        stat = self.path.stat()
+        self.path.write_text(json.dumps(data))
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    def misses(self):
+        return state.cache_stats()["misses"]
+
+    def test_unchanged_file_is_served_from_cache(self):
+        state.write_json(self.path, {"n": 1})
+        first = state.load_json(self.path, {})
+        misses = self.misses()
+        self.assertIs(state.load_json(self.path, {}), first)
+        self.assertEqual(self.misses(), misses)
+
+    def test_write_json_invalidates(self):
+        state.write_json(self.path, {"n": 1})
+        self.assertEqual(state.load_json(self.path, {}), {"n": 1})
+        state.write_json(self.path, {"n": 2})
+        self.assertEqual(state.load_json(self.path, {}), {"n": 2})
+
+    def test_external_replace_is_noticed(self):
+        state.write_json(self.path, {"n": 1})
+        self.assertEqual(state.load_json(self.path, {}), {"n": 1})
+        # Another process replacing the file (new inode) without touching our cache
+        other = self.path.with_name("other.json")
+        other.write_text(json.dumps({"n": 2}))
+        os.replace(other, self.path)
+        self.assertEqual(state.load_json(self.path, {}), {"n": 2})
+
+    def test_build_result_is_cached_per_function(self):
+        state.write_json(self.path, [3, 1, 2])
+        calls = []
+
+        def build(data):
+            calls.append(data)
+            return sorted(data)
+
+        self.assertEqual(state.load_json(self.path, [], build=build), [1, 2, 3])
+        self.assertEqual(state.load_json(self.path, [], build=build), [1, 2, 3])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(state.load_json(self.path, [], build=len), 3)
+        self.assertEqual(state.load_json(self.path, []), [3, 1, 2])
+
+        state.write_json(self.path, [5])
+        self.assertEqual(state.load_json(self.path, [], build=build), [5])
+        self.assertEqual(len(calls), 2)
+
+    def test_missing_or_corrupt_file_returns_default(self):
+        self.assertEqual(state.load_json(self.path, {"default": True}), {"default": True})
+        self.path.write_text("{not json")
+        self.assertEqual(state.load_json(self.path, []), [])
+
+    def test_update_json_reads_from_disk_not_cache(self):
+        state.write_json(self.path, {"n": 1})
+        self.assertEqual(state.load_json(self.path, {}), {"n": 1})
+        self.write_behind_cache({"n": 2})
+
+        written = state.update_json(self.path, {}, lambda data: {"n": data["n"] + 1})
+        self.assertEqual(written, {"n": 3})
+        self.assertEqual(state.read_json(self.path, {}), {"n": 3})
+
+    def test_update_json_missing_file_uses_default(self):
+        state.update_json(self.path, [], lambda data: data + [1])
+        self.assertEqual(state.load_json(self.path, None), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""TaskCatalog, AnydayPool and weighted_sample.
+
+    python -m pytest tests/
+"""
+import random
+import unittest
+
+import bot
+
+OPERATIONS = [
+    "<https://example.com/imaging|System Imaging FTE/Contract>",
+    "<https://example.com/offboard|Offboard Hold Checks>",
+    "Audit Idle Hardware",
+    "<https://example.com/onboarding|Onboarding Tickets>",
+    "audit idle hardware",
+]
+
+
+class TaskCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = bot.TaskCatalog(OPERATIONS)
+
+    def test_categories(self):
+        self.assertEqual(self.catalog.onboarding.raw, OPERATIONS[3])
+        self.assertEqual(self.catalog.imaging.raw, OPERATIONS[0])
+        self.assertEqual([t.name for t in self.catalog.anyday],
+                         ["Offboard Hold Checks", "Audit Idle Hardware", "audit idle hardware"])
+
+    def test_lookup_by_key(self):
+        task = self.catalog.get("offboard hold checks")
+        self.assertEqual(task.raw, OPERATIONS[1])
+        self.assertEqual(task.url, "https://example.com/offboard")
+        # The first spelling of a repeated name wins
+        self.assertEqual(self.catalog.get("audit idle hardware").raw, "Audit Idle Hardware")
+        self.assertIsNone(self.catalog.get("Offboard Hold Checks"))
+
+    def test_key_of(self):
+        self.assertEqual(self.catalog.key_of(OPERATIONS[0]), "system imaging fte/contract")
+        self.assertEqual(self.catalog.key_of("<https://x|Not In Catalog>"), "not in catalog")
+
+
+class AnydayPoolTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(7)
+        self.tasks = bot.TaskCatalog([f"Task {i}" for i in range(6)]).anyday
+
+    def test_each_task_handed_out_once(self):
+        pool = bot.AnydayPool(self.tasks)
+        taken = [pool.take() for _ in range(6)]
+        self.assertEqual(sorted(t.key for t in taken), sorted(t.key for t in self.tasks))
+        self.assertEqual(len(pool), 0)
+        self.assertIsNone(pool.take())
+
+    def test_duplicate_keys_collapse(self):
+        self.assertEqual(len(bot.AnydayPool(self.tasks + self.tasks[:2])), 6)
+
+    def test_avoids_yesterdays_tasks_while_others_remain(self):
+        for yesterday in (["task 0"], ["task 0", "task 1", "task 2", "task 3"]):
+            for _ in range(50):
+                pool = bot.AnydayPool(self.tasks)
+                self.assertNotIn(pool.take(yesterday).key, yesterday)
+
+    def test_falls_back_to_yesterdays_task(self):
+        pool = bot.AnydayPool(self.tasks[:1])
+        self.assertEqual(pool.take(["task 0"]).key, "task 0")
+
+
+class WeightedSampleTest(unittest.TestCase):
+    def test_distinct_items(self):
+        rng = random.Random(3)
+        for _ in range(100):
+            picked = bot.weighted_sample(list("abcde"), [1, 2, 3, 4, 5], 3, rng)
+            self.assertEqual(len(set(picked)), 3)
+        self.assertEqual(sorted(bot.weighted_sample(list("ab"), [1, 1], 5, rng)), ["a", "b"])
+
+    def test_first_draw_proportional_to_weight(self):
+        rng = random.Random(5)
+        trials = 20000
+        first = sum(bot.weighted_sample(["a", "b"], [1, 3], 1, rng) == ["b"] for _ in range(trials))
+        self.assertAlmostEqual(first / trials, 0.75, delta=0.02)
+
+    def test_uniform_without_weights(self):
+        rng = random.Random(9)
+        self.assertEqual(sorted(bot.weighted_sample(list("abc"), None, 3, rng)), ["a", "b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()